@@ -0,0 +1,184 @@
+import asyncio
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+class AsyncRedmineClient:
+    """RedmineClientの非同期版（httpxのコネクションプールを共有し、同時リクエスト数をセマフォで制限）
+    
+    ページ取得・チケット詳細・マスタデータの取得を同じイベントループ上で並行して実行できる。
+    """
+    
+    # リトライ対象のHTTPステータス（レート制限・サーバーエラー）
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    def __init__(self, base_url: str, api_key: str, pool_size: int = 10, max_concurrency: int = 8,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.headers = {
+            'X-Redmine-API-Key': api_key,
+            'Content-Type': 'application/json'
+        }
+        self.pool_size = pool_size
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # httpxのクライアントとセマフォはイベントループに結び付くため、最初の呼び出し時に作成する
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self) -> 'AsyncRedmineClient':
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+    
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+    
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+    
+    async def _get(self, path: str, params: Optional[Dict] = None) -> Dict:
+        client = self._ensure_client()
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff_factor * (2 ** attempt)
+            try:
+                async with self._semaphore:
+                    response = await client.get(path, params=params)
+                if response.status_code not in self.RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response.json()
+                # Retry-Afterが指定されていればそれに従う
+                retry_after = response.headers.get('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    delay = float(retry_after)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+            await asyncio.sleep(delay)
+    
+    async def get_issues(self, limit: int = 100, offset: int = 0, **kwargs) -> Dict:
+        params = {
+            'limit': limit,
+            'offset': offset,
+            **kwargs
+        }
+        
+        try:
+            return await self._get("/issues.json", params)
+        except httpx.HTTPError as e:
+            raise Exception(f"チケット取得エラー: {e}")
+    
+    async def get_all_issues(self, **kwargs) -> List[Dict]:
+        limit = 100
+        
+        # 1ページ目でtotal_countを取得し、残りのページは並行して取得（gatherは入力順に結果を返す）
+        first_page = await self.get_issues(limit=limit, offset=0, **kwargs)
+        all_issues = list(first_page.get('issues', []))
+        total_count = first_page.get('total_count', len(all_issues))
+        
+        pages = await asyncio.gather(*[
+            self.get_issues(limit=limit, offset=offset, **kwargs)
+            for offset in range(limit, total_count, limit)
+        ])
+        for page in pages:
+            all_issues.extend(page.get('issues', []))
+        return all_issues
+    
+    async def get_issue_by_id(self, issue_id: int) -> Dict:
+        try:
+            params = {
+                'include': 'journals'
+            }
+            data = await self._get(f"/issues/{int(issue_id)}.json", params)
+            return data['issue']
+        except httpx.HTTPError as e:
+            raise Exception(f"チケット詳細取得エラー: {e}")
+    
+    async def get_issues_by_ids(self, issue_ids: Iterable[int]) -> List[Dict]:
+        """複数チケットの詳細を並行して取得（結果は入力順）"""
+        return list(await asyncio.gather(*[self.get_issue_by_id(issue_id) for issue_id in issue_ids]))
+    
+    async def _get_all_pages(self, path: str, key: str, limit: int = 100) -> List[Dict]:
+        first_page = await self._get(path, {'limit': limit, 'offset': 0})
+        items = list(first_page.get(key, []))
+        if 'total_count' not in first_page:
+            return items
+        
+        pages = await asyncio.gather(*[
+            self._get(path, {'limit': limit, 'offset': offset})
+            for offset in range(limit, first_page['total_count'], limit)
+        ])
+        for page in pages:
+            items.extend(page.get(key, []))
+        return items
+    
+    async def get_projects(self) -> List[Dict]:
+        try:
+            return await self._get_all_pages("/projects.json", 'projects')
+        except httpx.HTTPError as e:
+            raise Exception(f"プロジェクト取得エラー: {e}")
+    
+    async def get_users(self) -> List[Dict]:
+        try:
+            return await self._get_all_pages("/users.json", 'users')
+        except httpx.HTTPError as e:
+            raise Exception(f"ユーザー取得エラー: {e}")
+
+class SyncRedmineClient:
+    """AsyncRedmineClientを同期コードから呼び出すための薄いラッパー
+    
+    専用スレッドでイベントループを動かし続けるため、呼び出しをまたいでコネクションプールが再利用される。
+    Streamlitのスクリプトのように、イベントループを持たないスレッドからも利用できる。
+    """
+    
+    def __init__(self, base_url: str, api_key: str, **kwargs):
+        self.async_client = AsyncRedmineClient(base_url, api_key, **kwargs)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='redmine-async', daemon=True)
+        self._thread.start()
+    
+    def run(self, coroutine):
+        """コルーチンをイベントループで実行して結果を返す（複数の取得をまとめて並行実行する場合に使用）"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+    
+    def get_issues(self, limit: int = 100, offset: int = 0, **kwargs) -> Dict:
+        return self.run(self.async_client.get_issues(limit=limit, offset=offset, **kwargs))
+    
+    def get_all_issues(self, **kwargs) -> List[Dict]:
+        return self.run(self.async_client.get_all_issues(**kwargs))
+    
+    def get_issue_by_id(self, issue_id: int) -> Dict:
+        return self.run(self.async_client.get_issue_by_id(issue_id))
+    
+    def get_issues_by_ids(self, issue_ids: Iterable[int]) -> List[Dict]:
+        return self.run(self.async_client.get_issues_by_ids(issue_ids))
+    
+    def get_projects(self) -> List[Dict]:
+        return self.run(self.async_client.get_projects())
+    
+    def get_users(self) -> List[Dict]:
+        return self.run(self.async_client.get_users())
+    
+    def close(self):
+        if self._loop.is_running():
+            self.run(self.async_client.aclose())
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop.close()
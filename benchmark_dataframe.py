@@ -0,0 +1,123 @@
+"""
+issues_to_dataframe のベンチマークスクリプト
+
+旧実装（1チケットごとにdictを作成し、日付列を推論付きで変換）と
+現行の列単位の実装を、合成したチケットデータで比較します。
+    
+    python benchmark_dataframe.py [チケット数]
+"""
+import gc
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+from redmine_client import RedmineClient
+
+def make_issues(count):
+    projects = [{'id': i, 'name': f"プロジェクト{i}"} for i in range(1, 21)]
+    statuses = [{'id': i, 'name': name} for i, name in enumerate(['新規', '進行中', '解決', 'フィードバック', '終了'], 1)]
+    trackers = [{'id': i, 'name': name} for i, name in enumerate(['バグ', '機能', 'サポート'], 1)]
+    priorities = [{'id': i, 'name': name} for i, name in enumerate(['低め', '通常', '高め', '急いで'], 1)]
+    users = [{'id': i, 'name': f"ユーザー{i}"} for i in range(1, 201)]
+    
+    issues = []
+    for issue_id in range(count, 0, -1):
+        issue = {
+            'id': issue_id,
+            'project': random.choice(projects),
+            'tracker': random.choice(trackers),
+            'status': random.choice(statuses),
+            'priority': random.choice(priorities),
+            'author': random.choice(users),
+            'subject': f"チケット {issue_id} の件名",
+            'description': "説明文 " * random.randint(5, 50),
+            'start_date': f"2024-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
+            'due_date': f"2025-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}" if random.random() < 0.7 else None,
+            'done_ratio': random.choice([0, 10, 50, 80, 100]),
+            'estimated_hours': random.choice([None, 1.0, 4.0, 8.0]),
+            'spent_hours': random.choice([0.0, 0.5, 2.0, 6.0]),
+            'is_private': False,
+            'created_on': "2024-01-01T09:00:00Z",
+            # 実データの更新日時はほぼ重複しないため、時刻もばらつかせる
+            'updated_on': f"2024-06-{random.randint(1, 28):02d}T{random.randint(0, 23):02d}:{random.randint(0, 59):02d}:{random.randint(0, 59):02d}Z",
+            'closed_on': "2024-07-01T00:00:00Z" if random.random() < 0.3 else None,
+        }
+        if random.random() < 0.8:
+            issue['assigned_to'] = random.choice(users)
+        issues.append(issue)
+    return issues
+
+def legacy_issues_to_dataframe(issues):
+    """変更前の実装（比較用）"""
+    data = []
+    
+    for issue in issues:
+        row = {
+            'ID': issue.get('id'),
+            'プロジェクト': issue.get('project', {}).get('name', ''),
+            'トラッカー': issue.get('tracker', {}).get('name', ''),
+            'ステータス': issue.get('status', {}).get('name', ''),
+            '優先度': issue.get('priority', {}).get('name', ''),
+            '件名': issue.get('subject', ''),
+            '説明': issue.get('description', ''),
+            '作成者': issue.get('author', {}).get('name', ''),
+            '担当者': issue.get('assigned_to', {}).get('name', '') if issue.get('assigned_to') else '',
+            '開始日': issue.get('start_date', ''),
+            '期限日': issue.get('due_date', ''),
+            '進捗率': issue.get('done_ratio', 0),
+            '予定工数': issue.get('estimated_hours', 0) or 0,
+            '実績工数': issue.get('spent_hours', 0) or 0,
+            '作成日': issue.get('created_on', ''),
+            '更新日': issue.get('updated_on', ''),
+            '終了日': issue.get('closed_on', ''),
+            'プライベート': issue.get('is_private', False)
+        }
+        data.append(row)
+    
+    df = pd.DataFrame(data)
+    
+    for date_col in ['開始日', '期限日', '作成日', '更新日', '終了日']:
+        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+    
+    return df
+
+def measure(label, func, issues, repeat=3):
+    # 直前の処理のガベージコレクションに左右されないよう、複数回の最短時間を使う
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        df = func(issues)
+        timings.append(time.perf_counter() - start)
+    elapsed = min(timings)
+    
+    # tracemallocは処理時間を大きく歪めるため、ピークメモリは別途計測する
+    tracemalloc.start()
+    func(issues)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    frame_bytes = df.memory_usage(deep=True).sum()
+    print(f"{label}: {elapsed:.3f}秒  ピークメモリ {peak / 1024 / 1024:.1f}MB  DataFrame {frame_bytes / 1024 / 1024:.1f}MB")
+    return elapsed, df
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    random.seed(0)
+    issues = make_issues(count)
+    client = RedmineClient("http://localhost:3000", "")
+    
+    print(f"=== issues_to_dataframe ベンチマーク ({count}件) ===")
+    legacy_time, legacy_df = measure("旧実装", legacy_issues_to_dataframe, issues)
+    new_time, new_df = measure("現行実装", client.issues_to_dataframe, issues)
+    
+    # 現行実装はID列（プロジェクトIDなど）とバージョンを追加しているため、共通の列で比較する
+    shared_columns = [col for col in legacy_df.columns if col in new_df.columns]
+    assert shared_columns == [col for col in new_df.columns if col in legacy_df.columns]
+    assert (legacy_df['ID'].values == new_df['ID'].values).all()
+    for col in ['プロジェクト', 'ステータス', '担当者']:
+        assert (legacy_df[col].astype(str).values == new_df[col].astype(str).values).all()
+    print(f"高速化: {legacy_time / new_time:.1f}倍")
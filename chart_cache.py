@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List
+
+class FigureCache:
+    """グラフ（Plotly Figure）のメモ化キャッシュ
+    
+    データのバージョン・フィルター条件・グラフ名をキーに生成済みのFigureを保持し、
+    関係のないウィジェット操作による再実行ではグラフを作り直さない。
+    グラフごとの生成時間・ヒット率と、ブラウザに送るFigureのJSONサイズを記録する。
+    """
+    
+    _MISSING = object()
+    
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self._figures = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+    
+    def get_or_build(self, key: Hashable, chart_name: str, builder: Callable):
+        """キャッシュ済みのFigureを返す（なければ生成して保持）"""
+        cache_key = (key, chart_name)
+        with self._lock:
+            stats = self._stats.setdefault(chart_name, {'hits': 0, 'builds': 0, 'build_seconds': 0.0, 'last_seconds': 0.0, 'last_bytes': 0})
+            figure = self._figures.get(cache_key, self._MISSING)
+            if figure is not self._MISSING:
+                self._figures.move_to_end(cache_key)
+                stats['hits'] += 1
+                return figure
+        
+        start = time.perf_counter()
+        figure = builder()
+        elapsed = time.perf_counter() - start
+        payload_bytes = self.payload_bytes(figure)
+        
+        with self._lock:
+            stats['builds'] += 1
+            stats['build_seconds'] += elapsed
+            stats['last_seconds'] = elapsed
+            stats['last_bytes'] = payload_bytes
+            self._figures[cache_key] = figure
+            self._figures.move_to_end(cache_key)
+            while len(self._figures) > self.max_size:
+                self._figures.popitem(last=False)
+        return figure
+    
+    @staticmethod
+    def payload_bytes(figure) -> int:
+        """FigureをJSONにしたときのバイト数（グラフがない場合は0）"""
+        if figure is None or not hasattr(figure, 'to_json'):
+            return 0
+        return len(figure.to_json().encode('utf-8'))
+    
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+    
+    def stats(self) -> List[Dict]:
+        """グラフごとの生成回数・ヒット数・ヒット率・平均生成時間・データ量"""
+        with self._lock:
+            rows = []
+            for chart_name, stats in self._stats.items():
+                requests = stats['hits'] + stats['builds']
+                rows.append({
+                    'グラフ': chart_name,
+                    '生成': stats['builds'],
+                    'ヒット': stats['hits'],
+                    'ヒット率(%)': stats['hits'] / requests * 100 if requests else 0.0,
+                    '平均生成時間(ms)': stats['build_seconds'] / stats['builds'] * 1000 if stats['builds'] else 0.0,
+                    '直近生成時間(ms)': stats['last_seconds'] * 1000,
+                    'データ量(KB)': stats['last_bytes'] / 1024,
+                })
+            return rows
@@ -0,0 +1,78 @@
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+class IssueCube:
+    """チケットの集計キューブ（プロジェクト×ステータス×トラッカー×優先度×担当者）
+    
+    データ読み込み時に一度だけ集計しておき、グラフや概要統計はキューブの切り出しで求める。
+    フィルター変更時はチケット全件ではなく、組み合わせ数ぶんの行だけを参照する。
+    """
+    
+    DIMENSIONS = ['プロジェクト', 'ステータス', 'トラッカー', '優先度', '担当者']
+    CLOSED_STATUS_PATTERN = '終了|完了|解決済み'
+    
+    def __init__(self, cells: pd.DataFrame):
+        self.cells = cells
+        self._slices = {}
+    
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'IssueCube':
+        """チケット一覧から集計キューブを作成"""
+        if df.empty:
+            return cls(pd.DataFrame(columns=cls.DIMENSIONS + ['チケット数', '予定工数', '実績工数', '進捗率合計']))
+        
+        measures = pd.DataFrame({
+            '予定工数': df['予定工数'].astype('float64'),
+            '実績工数': df['実績工数'].astype('float64'),
+            '進捗率合計': df['進捗率'].astype('float64'),
+        })
+        grouped = measures.groupby([df[col] for col in cls.DIMENSIONS], observed=True, dropna=False)
+        cells = grouped.sum()
+        cells.insert(0, 'チケット数', grouped.size())
+        return cls(cells.reset_index())
+    
+    @property
+    def empty(self) -> bool:
+        return self.cells.empty
+    
+    def slice(self, filters: Optional[Dict[str, str]] = None) -> 'IssueCube':
+        """指定した次元の値で絞り込んだキューブを返す（結果は条件ごとに保持）"""
+        key = tuple(sorted((filters or {}).items()))
+        if not key:
+            return self
+        cube = self._slices.get(key)
+        if cube is None:
+            mask = pd.Series(True, index=self.cells.index)
+            for col, value in key:
+                mask &= self.cells[col] == value
+            cube = IssueCube(self.cells[mask].reset_index(drop=True))
+            self._slices[key] = cube
+        return cube
+    
+    def counts(self, dimension: str) -> pd.Series:
+        """次元の値ごとのチケット数（件数の多い順）"""
+        return self.totals(dimension)['チケット数'].sort_values(ascending=False, kind='stable')
+    
+    def totals(self, dimension: str) -> pd.DataFrame:
+        """次元の値ごとのチケット数・予定工数・実績工数"""
+        totals = self.cells.groupby(dimension, observed=True)[['チケット数', '予定工数', '実績工数']].sum()
+        return totals[totals['チケット数'] > 0]
+    
+    def total_count(self) -> int:
+        return int(self.cells['チケット数'].sum())
+    
+    def open_count(self, closed_statuses: Optional[Iterable[str]] = None) -> int:
+        """未完了のチケット数（closed_statusesはRedmineでis_closedのステータス名。未指定なら名前で判定）"""
+        if closed_statuses is not None:
+            closed = self.cells['ステータス'].isin(list(closed_statuses))
+        else:
+            closed = self.cells['ステータス'].astype(str).str.contains(self.CLOSED_STATUS_PATTERN, na=False)
+        return int(self.cells.loc[~closed, 'チケット数'].sum())
+    
+    def average_progress(self) -> float:
+        count = self.total_count()
+        return float(self.cells['進捗率合計'].sum() / count) if count else float('nan')
+    
+    def total_spent_hours(self) -> float:
+        return float(self.cells['実績工数'].sum())
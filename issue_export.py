@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Iterator, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+
+class IssueExporter:
+    """チケット一覧をチャンク単位でファイルに書き出すエクスポーター
+    
+    DataFrame全体を1つの文字列やバイト列に変換せず、ディスク上のファイルへ順に書き込む。
+    生成したファイルはフィルター条件などのキーごとに保持し、同じ条件では再利用する。
+    """
+    
+    # 形式 -> (表示名, MIMEタイプ, 拡張子)
+    FORMATS = {
+        'csv': ('CSV', 'text/csv', 'csv'),
+        'xlsx': ('Excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+        'parquet': ('Parquet', 'application/vnd.apache.parquet', 'parquet'),
+    }
+    
+    def __init__(self, export_dir: str, max_entries: int = 8, max_age: float = 600.0, chunk_size: int = 5000):
+        self.export_dir = export_dir
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.chunk_size = chunk_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(export_dir, exist_ok=True)
+        # 前回起動時のファイルは管理対象外のため削除する
+        for name in os.listdir(export_dir):
+            os.remove(os.path.join(export_dir, name))
+    
+    def export(self, key: Hashable, fmt: str, chunks: Callable[[], Iterable[pd.DataFrame]]) -> str:
+        """キーに対応するエクスポートファイルのパスを返す（未作成・期限切れの場合のみ生成）"""
+        cache_key = (key, fmt)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                created_at, path = entry
+                if time.monotonic() - created_at <= self.max_age and os.path.exists(path):
+                    self._entries.move_to_end(cache_key)
+                    return path
+                self._remove(cache_key)
+        
+        extension = self.FORMATS[fmt][2]
+        path = os.path.join(self.export_dir, f"{uuid.uuid4().hex}.{extension}")
+        tmp_path = f"{path}.tmp"
+        writer = getattr(self, f"_write_{fmt}")
+        try:
+            writer(chunks(), tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        with self._lock:
+            if cache_key in self._entries:
+                self._remove(cache_key)
+            self._entries[cache_key] = (time.monotonic(), path)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return path
+    
+    def _remove(self, cache_key):
+        _, path = self._entries.pop(cache_key)
+        if os.path.exists(path):
+            os.remove(path)
+    
+    def iter_dataframe_chunks(self, df: pd.DataFrame) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(df), self.chunk_size):
+            yield df.iloc[start:start + self.chunk_size]
+    
+    def _write_csv(self, chunks: Iterable[pd.DataFrame], path: str):
+        # utf-8-sigはファイル先頭にのみBOMを書き込む
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=(i == 0))
+    
+    def _write_xlsx(self, chunks: Iterable[pd.DataFrame], path: str):
+        # 書き込み専用モードで行を順に出力し、ワークブック全体をメモリに保持しない
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("チケット一覧")
+        for i, chunk in enumerate(chunks):
+            if i == 0:
+                sheet.append(list(chunk.columns))
+            for row in self._to_excel_values(chunk).itertuples(index=False, name=None):
+                sheet.append(row)
+        workbook.save(path)
+    
+    def _write_parquet(self, chunks: Iterable[pd.DataFrame], path: str):
+        writer: Optional[pq.ParquetWriter] = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                else:
+                    table = table.cast(writer.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        if writer is None:
+            # 0件の場合も空のファイルを作成する
+            pq.write_table(pa.table({}), path)
+    
+    @staticmethod
+    def _to_excel_values(chunk: pd.DataFrame) -> pd.DataFrame:
+        """Excelが扱えない値（タイムゾーン付き日時・カテゴリ型・欠損値）を変換"""
+        converted = {}
+        for col in chunk.columns:
+            series = chunk[col]
+            if isinstance(series.dtype, pd.DatetimeTZDtype):
+                series = series.dt.tz_localize(None)
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype(object)
+            converted[col] = series.astype(object).where(series.notna(), None)
+        return pd.DataFrame(converted)
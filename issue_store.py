@@ -0,0 +1,416 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+class IssueStore:
+    """RedmineのチケットをローカルディスクへRedmine URL単位で永続化するストア
+    
+    - SQLite: チケットの生JSONをIDでupsert（差分同期・説明文などの参照用）
+    - Parquet: DataFrameのスナップショット（再起動時の高速ロード用）
+    """
+    
+    def __init__(self, redmine_url: str, api_key: str = '', base_dir: str = '.redmine_cache'):
+        url_key = hashlib.sha256(redmine_url.rstrip('/').encode('utf-8')).hexdigest()[:16]
+        # APIキーごとに閲覧権限が異なるため、同じURLでもキー単位でファイルを分ける
+        scope_key = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+        
+        self.scope_key = scope_key
+        self.directory = os.path.join(base_dir, url_key)
+        self.db_path = os.path.join(self.directory, f"issues_{scope_key}.sqlite3")
+        self.snapshot_path = os.path.join(self.directory, f"issues_{scope_key}.parquet")
+        self._lock = threading.Lock()
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._init_db()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+    
+    def _init_db(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS issues ('
+                'id INTEGER PRIMARY KEY, updated_on TEXT, data TEXT NOT NULL)'
+            )
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+            # ステータス変更履歴（時刻はUNIX秒、作成時点の状態はjournal_id=0で表す）
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS status_events ('
+                'issue_id INTEGER NOT NULL, journal_id INTEGER NOT NULL, changed_on INTEGER NOT NULL, '
+                'old_status_id INTEGER, new_status_id INTEGER NOT NULL, PRIMARY KEY (issue_id, journal_id))'
+            )
+            # 推移グラフ用: チケットごとの現在の状態と、プロジェクト×ステータスの現在値・日次スナップショット
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS issue_state ('
+                'issue_id INTEGER PRIMARY KEY, project_id INTEGER, status_id INTEGER, estimated_hours REAL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS status_totals ('
+                'project_id INTEGER, status_id INTEGER, issue_count INTEGER, estimated_hours REAL, '
+                'PRIMARY KEY (project_id, status_id))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS daily_status_counts ('
+                'day TEXT, project_id INTEGER, status_id INTEGER, issue_count INTEGER, estimated_hours REAL, '
+                'PRIMARY KEY (day, project_id, status_id))'
+            )
+            # 作業時間の記録と、その集計（ユーザー×プロジェクト×週、ユーザー×作業分類）
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS time_entries ('
+                'id INTEGER PRIMARY KEY, spent_on TEXT NOT NULL, user_id INTEGER, user_name TEXT, '
+                'project_id INTEGER, project_name TEXT, activity_id INTEGER, activity_name TEXT, '
+                'issue_id INTEGER, hours REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS time_entries_spent_on ON time_entries (spent_on)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS time_rollup_user_project_week ('
+                'user_id INTEGER, user_name TEXT, project_id INTEGER, project_name TEXT, week TEXT, hours REAL, '
+                'PRIMARY KEY (user_id, project_id, week))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS time_rollup_user_activity ('
+                'user_id INTEGER, user_name TEXT, activity_id INTEGER, activity_name TEXT, hours REAL, '
+                'PRIMARY KEY (user_id, activity_id))'
+            )
+            # 履歴を取り込んだ時点のチケットのupdated_on（差分取り込みの判定用）
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS status_history_versions (issue_id INTEGER PRIMARY KEY, updated_on TEXT)'
+            )
+    
+    def upsert_issues(self, issues: Iterable[Dict]):
+        rows = [
+            (issue['id'], issue.get('updated_on'), json.dumps(issue, ensure_ascii=False))
+            for issue in issues
+        ]
+        if not rows:
+            return
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany(
+                'INSERT INTO issues (id, updated_on, data) VALUES (?, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET updated_on = excluded.updated_on, data = excluded.data',
+                rows
+            )
+    
+    def replace_issues(self, issues: Iterable[Dict]) -> List[int]:
+        """全件取得の結果でストアの内容を置き換え、取得結果に含まれなくなったチケットのIDを返す"""
+        issues = list(issues)
+        with self._lock, closing(self._connect()) as conn, conn:
+            previous_ids = {row[0] for row in conn.execute('SELECT id FROM issues')}
+            conn.execute('DELETE FROM issues')
+            conn.executemany(
+                'INSERT INTO issues (id, updated_on, data) VALUES (?, ?, ?)',
+                [
+                    (issue['id'], issue.get('updated_on'), json.dumps(issue, ensure_ascii=False))
+                    for issue in issues
+                ]
+            )
+        return sorted(previous_ids - {issue['id'] for issue in issues})
+    
+    def delete_issues(self, issue_ids: Iterable[int]):
+        ids = [(int(issue_id),) for issue_id in issue_ids]
+        if not ids:
+            return
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany('DELETE FROM issues WHERE id = ?', ids)
+            conn.executemany('DELETE FROM status_events WHERE issue_id = ?', ids)
+            conn.executemany('DELETE FROM status_history_versions WHERE issue_id = ?', ids)
+    
+    def get_issue(self, issue_id: int) -> Optional[Dict]:
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT data FROM issues WHERE id = ?', (int(issue_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def get_descriptions(self, issue_ids: Iterable[int]) -> Dict[int, str]:
+        """説明文のみをSQLite側で抽出して返す（DataFrameには保持しない重い列）"""
+        ids = [int(issue_id) for issue_id in issue_ids]
+        descriptions = {}
+        with closing(self._connect()) as conn:
+            # SQLiteの変数上限を超えないよう分割して問い合わせる
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT id, json_extract(data, '$.description') FROM issues WHERE id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                descriptions.update({row[0]: row[1] or '' for row in rows})
+        return descriptions
+    
+    def load_issues(self) -> List[Dict]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute('SELECT data FROM issues ORDER BY id DESC').fetchall()
+        return [json.loads(row[0]) for row in rows]
+    
+    def get_meta(self, key: str) -> Optional[str]:
+        with closing(self._connect()) as conn:
+            row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+    
+    def set_meta(self, key: str, value: Optional[str]):
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT INTO meta (key, value) VALUES (?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET value = excluded.value',
+                (key, value)
+            )
+    
+    def replace_status_events(self, versions: Dict[int, Optional[str]], events: Iterable[tuple]):
+        """チケット単位でステータス変更履歴を置き換え（versionsは取り込んだチケットのupdated_on）"""
+        ids = [(int(issue_id),) for issue_id in versions]
+        if not ids:
+            return
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.executemany('DELETE FROM status_events WHERE issue_id = ?', ids)
+            conn.executemany(
+                'INSERT OR REPLACE INTO status_events '
+                '(issue_id, journal_id, changed_on, old_status_id, new_status_id) VALUES (?, ?, ?, ?, ?)',
+                events
+            )
+            conn.executemany(
+                'INSERT INTO status_history_versions (issue_id, updated_on) VALUES (?, ?) '
+                'ON CONFLICT(issue_id) DO UPDATE SET updated_on = excluded.updated_on',
+                list(versions.items())
+            )
+            # 読み込み側のキャッシュを無効化するためのバージョン
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('status_history_version', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+    
+    def get_status_history_versions(self) -> Dict[int, str]:
+        with closing(self._connect()) as conn:
+            rows = conn.execute('SELECT issue_id, updated_on FROM status_history_versions').fetchall()
+        return dict(rows)
+    
+    def load_status_events(self) -> pd.DataFrame:
+        """ステータス変更履歴を列指向のDataFrameとして読み込み（チケット・時刻順）"""
+        with closing(self._connect()) as conn:
+            events = pd.read_sql_query(
+                'SELECT issue_id, journal_id, changed_on, old_status_id, new_status_id '
+                'FROM status_events ORDER BY issue_id, changed_on, journal_id',
+                conn
+            )
+        return events.astype({
+            'issue_id': 'int32',
+            'journal_id': 'int64',
+            'changed_on': 'int64',
+            'old_status_id': 'Int32',
+            'new_status_id': 'int32',
+        })
+    
+    def record_issue_states(self, issues: List[Dict], day: str):
+        """同期で取得したチケットの状態変化を、その日のプロジェクト×ステータス別件数に反映
+        
+        変化したチケットの前回の状態との差分だけを集計値に加減するため、処理量は取得件数に比例する。
+        """
+        self._apply_issue_states({
+            issue['id']: (
+                (issue.get('project') or {}).get('id'),
+                (issue.get('status') or {}).get('id'),
+                float(issue.get('estimated_hours') or 0.0)
+            )
+            for issue in issues
+        }, day)
+    
+    def remove_issue_states(self, issue_ids: Iterable[int], day: str):
+        """削除・移動などで取得対象から外れたチケットを、その日の件数から差し引く"""
+        self._apply_issue_states({int(issue_id): None for issue_id in issue_ids}, day)
+    
+    def _apply_issue_states(self, new_states: Dict[int, Optional[tuple]], day: str):
+        # 値がNoneのチケットは前回の状態を差し引いて記録から除く
+        if not new_states:
+            return
+        
+        with self._lock, closing(self._connect()) as conn, conn:
+            ids = list(new_states)
+            old_states = {}
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT issue_id, project_id, status_id, estimated_hours FROM issue_state WHERE issue_id IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                old_states.update({row[0]: tuple(row[1:]) for row in rows})
+            
+            deltas = {}
+            for issue_id, new_state in new_states.items():
+                old_state = old_states.get(issue_id)
+                if old_state == new_state:
+                    continue
+                if old_state is not None:
+                    count, hours = deltas.get(old_state[:2], (0, 0.0))
+                    deltas[old_state[:2]] = (count - 1, hours - old_state[2])
+                if new_state is not None:
+                    count, hours = deltas.get(new_state[:2], (0, 0.0))
+                    deltas[new_state[:2]] = (count + 1, hours + new_state[2])
+            
+            conn.executemany(
+                'INSERT INTO issue_state (issue_id, project_id, status_id, estimated_hours) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(issue_id) DO UPDATE SET project_id = excluded.project_id, '
+                'status_id = excluded.status_id, estimated_hours = excluded.estimated_hours',
+                [(issue_id, *state) for issue_id, state in new_states.items() if state is not None]
+            )
+            conn.executemany(
+                'DELETE FROM issue_state WHERE issue_id = ?',
+                [(issue_id,) for issue_id, state in new_states.items() if state is None]
+            )
+            if not deltas:
+                return
+            conn.executemany(
+                'INSERT INTO status_totals (project_id, status_id, issue_count, estimated_hours) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(project_id, status_id) DO UPDATE SET '
+                'issue_count = issue_count + excluded.issue_count, estimated_hours = estimated_hours + excluded.estimated_hours',
+                [(*key, count, hours) for key, (count, hours) in deltas.items()]
+            )
+            # 変化したプロジェクト×ステータスのみ、その日の値として現在値を書き込む
+            conn.executemany(
+                'INSERT OR REPLACE INTO daily_status_counts (day, project_id, status_id, issue_count, estimated_hours) '
+                'SELECT ?, project_id, status_id, issue_count, estimated_hours FROM status_totals '
+                'WHERE project_id IS ? AND status_id IS ?',
+                [(day, *key) for key in deltas]
+            )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('status_counts_version', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+    
+    def has_issue_states(self) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute('SELECT 1 FROM issue_state LIMIT 1').fetchone() is not None
+    
+    def load_daily_status_counts(self) -> pd.DataFrame:
+        """日次スナップショット（変化のあった日・プロジェクト×ステータスの行のみ）"""
+        with closing(self._connect()) as conn:
+            counts = pd.read_sql_query(
+                'SELECT day, project_id, status_id, issue_count, estimated_hours FROM daily_status_counts ORDER BY day',
+                conn
+            )
+        counts['day'] = pd.to_datetime(counts['day'], format='%Y-%m-%d')
+        return counts
+    
+    def replace_time_entries(self, entries: List[Dict], since: Optional[str] = None):
+        """spent_onがsince以降の作業時間を置き換え、集計テーブルを差分で更新（sinceがNoneなら全件）
+        
+        置き換える範囲は、since以降の記録と今回取得した記録（日付がsince以降に変更されたものを含む）。
+        - ユーザー×作業分類: 置き換える範囲の旧い合計を引き、新しい合計を足す
+        - ユーザー×プロジェクト×週: sinceを含む週以降と、置き換えた記録の旧い日付の週を集計し直す
+        """
+        rows = [
+            (
+                entry['id'],
+                entry['spent_on'],
+                (entry.get('user') or {}).get('id'),
+                (entry.get('user') or {}).get('name', ''),
+                (entry.get('project') or {}).get('id'),
+                (entry.get('project') or {}).get('name', ''),
+                (entry.get('activity') or {}).get('id'),
+                (entry.get('activity') or {}).get('name', ''),
+                (entry.get('issue') or {}).get('id'),
+                float(entry.get('hours') or 0.0)
+            )
+            for entry in entries
+        ]
+        window = since or '0000-00-00'
+        replaced = 'spent_on >= ? OR id IN (SELECT id FROM incoming_time_entries)'
+        week_of = "date(spent_on, 'weekday 0', '-6 days')"
+        upsert_activity = (
+            'INSERT INTO time_rollup_user_activity (user_id, user_name, activity_id, activity_name, hours) '
+            f'SELECT user_id, user_name, activity_id, activity_name, {{sign}} SUM(hours) FROM time_entries WHERE {replaced} '
+            'GROUP BY user_id, activity_id '
+            'ON CONFLICT(user_id, activity_id) DO UPDATE SET hours = hours + excluded.hours, '
+            'user_name = excluded.user_name, activity_name = excluded.activity_name'
+        )
+        
+        with self._lock, closing(self._connect()) as conn, conn:
+            conn.execute('CREATE TEMP TABLE incoming_time_entries (id INTEGER PRIMARY KEY)')
+            conn.executemany('INSERT OR IGNORE INTO incoming_time_entries (id) VALUES (?)', [(row[0],) for row in rows])
+            
+            # 週は月曜始まり（sinceを含む週の月曜日以降と、範囲外から移ってきた記録の旧い週を再集計）
+            week_start = conn.execute("SELECT date(?, 'weekday 0', '-6 days')", (window,)).fetchone()[0] or window
+            old_weeks = [row[0] for row in conn.execute(
+                f'SELECT DISTINCT {week_of} FROM time_entries '
+                'WHERE spent_on < ? AND id IN (SELECT id FROM incoming_time_entries)',
+                (week_start,)
+            )]
+            # spent_onの索引を使えるよう、週ごとの日付範囲の条件にする
+            weeks = ' OR '.join(['spent_on >= ?'] + ["spent_on BETWEEN ? AND date(?, '+6 days')"] * len(old_weeks))
+            week_params = [week_start] + [week for week in old_weeks for _ in range(2)]
+            
+            conn.execute(upsert_activity.format(sign='-'), (window,))
+            conn.execute(f'DELETE FROM time_entries WHERE {replaced}', (window,))
+            conn.executemany(
+                'INSERT OR REPLACE INTO time_entries (id, spent_on, user_id, user_name, project_id, project_name, '
+                'activity_id, activity_name, issue_id, hours) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            conn.execute(upsert_activity.format(sign=''), (window,))
+            conn.execute('DELETE FROM time_rollup_user_activity WHERE ABS(hours) < 1e-9')
+            
+            conn.execute(
+                f"DELETE FROM time_rollup_user_project_week WHERE week >= ? OR week IN ({','.join('?' * len(old_weeks))})",
+                [week_start] + old_weeks
+            )
+            conn.execute(
+                'INSERT INTO time_rollup_user_project_week (user_id, user_name, project_id, project_name, week, hours) '
+                f"SELECT user_id, MAX(user_name), project_id, MAX(project_name), {week_of} AS week, "
+                f'SUM(hours) FROM time_entries WHERE {weeks} GROUP BY user_id, project_id, week',
+                week_params
+            )
+            conn.execute('DROP TABLE incoming_time_entries')
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('time_entries_version', '1') "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+    
+    def load_time_rollups(self) -> Dict[str, pd.DataFrame]:
+        """作業時間の集計テーブル（user_project_week / user_activity）を読み込み"""
+        with closing(self._connect()) as conn:
+            weekly = pd.read_sql_query('SELECT * FROM time_rollup_user_project_week', conn)
+            activity = pd.read_sql_query('SELECT * FROM time_rollup_user_activity', conn)
+        weekly['week'] = pd.to_datetime(weekly['week'], format='%Y-%m-%d')
+        return {'user_project_week': weekly, 'user_activity': activity}
+    
+    def write_snapshot(self, df: pd.DataFrame):
+        """Parquetスナップショットを書き込み（一時ファイル経由で原子的に置き換え）"""
+        tmp_path = f"{self.snapshot_path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.snapshot_path)
+    
+    def load_snapshot(self) -> Optional[pd.DataFrame]:
+        if not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            return pd.read_parquet(self.snapshot_path)
+        except Exception:
+            # 壊れたスナップショットは無視して再取得させる
+            return None
+    
+    def iter_snapshot_chunks(self, chunk_size: int = 10000,
+                             filters: Optional[Dict[str, object]] = None) -> Iterator[pd.DataFrame]:
+        """スナップショットを全件読み込まずに、行グループ単位で絞り込みながら順に返す"""
+        if not os.path.exists(self.snapshot_path):
+            return
+        parquet_file = pq.ParquetFile(self.snapshot_path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            chunk = batch.to_pandas()
+            for col, value in (filters or {}).items():
+                chunk = chunk[chunk[col] == value]
+            if not chunk.empty:
+                yield chunk.reset_index(drop=True)
+    
+    def snapshot_version(self) -> Optional[int]:
+        """スナップショットの更新を検知するためのバージョン（ファイル更新時刻）"""
+        try:
+            return os.stat(self.snapshot_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
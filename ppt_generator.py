@@ -4,27 +4,181 @@ from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
 from pptx.enum.shapes import MSO_SHAPE
 from pptx.enum.dml import MSO_THEME_COLOR
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.text.text import _Paragraph
+import copy
 import io
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 import textwrap
 
 class PowerPointGenerator:
-    def __init__(self):
+    # テンプレート内の差し込み位置を表すプレースホルダー（例: {{subject}}）
+    PLACEHOLDER_PATTERN = re.compile(r'\{\{(\w+)\}\}')
+    
+    # 1つのファイルにまとめる並列生成で、1プロセスに一度に渡すチケット数
+    # （完了した分から順に結合して進捗を通知するため、ワーカー数で等分せず小さめに区切る）
+    PARALLEL_CHUNK_SIZE = 16
+    
+    def __init__(self, use_template: bool = False, template: Optional[Union[str, bytes]] = None):
+        """use_template=Trueで、組み立て済みのスライドを複製して値を差し込むテンプレート方式にする
+        
+        templateに.pptxのパスまたはバイト列を渡すと、その1枚目のスライドを雛形として使用する
+        （{{subject}}などのプレースホルダーを含むブランド用テンプレートを想定）。
+        """
         self.prs = None
+        self.use_template = use_template or template is not None
+        self.template = template
+        self._template_elements = None
     
     def create_issue_report(self, issue_data: Dict) -> bytes:
-        self.prs = Presentation()
+        self.prs = self._new_presentation()
         
         # 1ページ目のみ作成（画像に基づいてレイアウト）
         self._create_issue_report_page(issue_data)
         
         return self._save_to_bytes()
     
-    def _create_issue_report_page(self, issue_data: Dict):
+    def create_batch_report(self, issues: Iterable[Dict], progress_callback: Optional[Callable] = None) -> bytes:
+        """複数チケットを1つのプレゼンテーションにまとめる（1チケット1スライド）"""
+        self.prs = self._new_presentation()
+        
+        for count, issue_data in enumerate(issues, 1):
+            self._create_issue_report_page(issue_data)
+            if progress_callback:
+                progress_callback(count, issue_data)
+        
+        return self._save_to_bytes()
+    
+    def create_batch_zip(self, issues: Iterable[Dict], progress_callback: Optional[Callable] = None) -> bytes:
+        """チケットごとの帳票ファイルをZIPにまとめる"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for count, issue_data in enumerate(issues, 1):
+                zf.writestr(f"ticket_{issue_data.get('id', count)}_report.pptx", self.create_issue_report(issue_data))
+                if progress_callback:
+                    progress_callback(count, issue_data)
+        
+        return buffer.getvalue()
+    
+    def render_parallel(self, issues: List[Dict], workers: Optional[int] = None, as_zip: bool = False,
+                        chunk_size: Optional[int] = None,
+                        progress_callback: Optional[Callable] = None) -> Tuple[bytes, Dict]:
+        """スライド生成を複数プロセスに分散して帳票を作成し、(ファイル, 処理統計)を返す
+        
+        1つのファイルにまとめる場合は、各プロセスがPARALLEL_CHUNK_SIZE件ずつのチケットを部分プレゼンテーションとして
+        描画し、先頭の塊から順にスライドの図形XMLを結合する（結合のたびに進捗を通知）。ZIPの場合はチケットごとのファイルを並列生成する。
+        """
+        workers = workers or os.cpu_count() or 1
+        issues = list(issues)
+        start = time.perf_counter()
+        
+        if as_zip:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf, self._process_pool(workers) as executor:
+                reports = executor.map(
+                    _render_issue_report, issues, repeat(self.use_template), repeat(self.template),
+                    chunksize=max(1, chunk_size or 1)
+                )
+                for count, (issue_data, report) in enumerate(zip(issues, reports), 1):
+                    zf.writestr(f"ticket_{issue_data.get('id', count)}_report.pptx", report)
+                    if progress_callback:
+                        progress_callback(count, issue_data)
+            output = buffer.getvalue()
+        else:
+            # 小さめの塊に分けて配分し、先頭の塊から順に結合する（チケット数が少なければ全ワーカーに行き渡る大きさにする）
+            chunk_size = chunk_size or max(1, min(self.PARALLEL_CHUNK_SIZE, -(-len(issues) // workers)))
+            chunks = [issues[i:i + chunk_size] for i in range(0, len(issues), chunk_size)]
+            self.prs = self._new_presentation()
+            count = 0
+            with self._process_pool(workers) as executor:
+                decks = executor.map(_render_batch_report, chunks, repeat(self.use_template), repeat(self.template))
+                for chunk, deck in zip(chunks, decks):
+                    self._append_slides(deck)
+                    for issue_data in chunk:
+                        count += 1
+                        if progress_callback:
+                            progress_callback(count, issue_data)
+            output = self._save_to_bytes()
+        
+        elapsed = time.perf_counter() - start
+        stats = {
+            'slides': len(issues),
+            'workers': workers,
+            'seconds': elapsed,
+            'slides_per_sec': len(issues) / elapsed if elapsed > 0 else 0.0
+        }
+        return output, stats
+    
+    def _process_pool(self, workers: int) -> ProcessPoolExecutor:
+        # Streamlitなどマルチスレッドのプロセスからforkするとデッドロックしうるためspawnで起動
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    
+    def _append_slides(self, deck_bytes: bytes):
+        """別のプレゼンテーションのスライドを図形XMLごと複製して末尾に追加"""
+        source = Presentation(io.BytesIO(deck_bytes))
+        for source_slide in source.slides:
+            slide = self._add_report_slide()
+            self._copy_shapes(source_slide, slide)
+    
+    def _copy_shapes(self, source_slide, slide):
+        """図形XMLを複製し、画像・リンクのリレーションIDを複製先スライドのものに付け替える"""
+        same_package = source_slide.part.package is slide.part.package
+        rid_map = {}
+        for rel_id, rel in source_slide.part.rels.items():
+            if rel.is_external:
+                rid_map[rel_id] = slide.part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+            elif rel.reltype == RT.IMAGE:
+                if same_package:
+                    rid_map[rel_id] = slide.part.relate_to(rel.target_part, rel.reltype)
+                else:
+                    _, rid_map[rel_id] = slide.part.get_or_add_image_part(io.BytesIO(rel.target_part.blob))
+        
+        rid_attrs = (qn('r:embed'), qn('r:link'), qn('r:id'))
+        sp_tree = slide.shapes._spTree
+        for shape in source_slide.shapes:
+            element = copy.deepcopy(shape._element)
+            if rid_map:
+                for node in element.iter():
+                    for attr in rid_attrs:
+                        if node.get(attr) in rid_map:
+                            node.set(attr, rid_map[node.get(attr)])
+            sp_tree.insert_element_before(element, 'p:extLst')
+    
+    def _new_presentation(self):
+        if self.template is None:
+            return Presentation()
+        source = io.BytesIO(self.template) if isinstance(self.template, bytes) else self.template
+        return Presentation(source)
+    
+    def _report_slide_layout(self):
+        if self.template is not None:
+            # ブランド用テンプレートは雛形スライドと同じレイアウトを使う
+            return self.prs.slides[0].slide_layout
         # 空白レイアウトを使用
-        slide_layout = self.prs.slide_layouts[6]
-        slide = self.prs.slides.add_slide(slide_layout)
+        return self.prs.slide_layouts[6]
+    
+    def _add_report_slide(self):
+        """帳票用のスライドを追加（レイアウトから自動で作られる空のプレースホルダーは取り除く）"""
+        slide = self.prs.slides.add_slide(self._report_slide_layout())
+        for placeholder in list(slide.placeholders):
+            placeholder._element.getparent().remove(placeholder._element)
+        return slide
+    
+    def _create_issue_report_page(self, issue_data: Dict):
+        if self.use_template:
+            self._stamp_issue_report_page(issue_data)
+            return
+        
+        slide = self._add_report_slide()
         
         # トラッカー・ID・ステータスヘッダー部分
         self._add_header_section(slide, issue_data)
@@ -47,6 +201,84 @@ class PowerPointGenerator:
         # 更新履歴フッター
         self._add_footer_section(slide, issue_data)
     
+    def _stamp_issue_report_page(self, issue_data: Dict):
+        """雛形スライドの図形を複製し、プレースホルダーにチケットの値を差し込む"""
+        template_slide = self._get_template_slide()
+        slide = self._add_report_slide()
+        self._copy_shapes(template_slide, slide)
+        
+        fields = self._template_fields(issue_data)
+        for p in slide.shapes._spTree.iter(qn('a:p')):
+            # プレースホルダーが複数のランに分割されていても検出できるよう段落単位で連結して判定
+            if '{{' not in ''.join(p.itertext()):
+                continue
+            paragraph = _Paragraph(p, None)
+            # 段落の書式（pPr）は残したまま、文字列だけを置き換える
+            paragraph.text = self.PLACEHOLDER_PATTERN.sub(lambda m: fields.get(m.group(1), ''), paragraph.text)
+    
+    def _get_template_slide(self):
+        if self.template is not None:
+            return self.prs.slides[0]
+        if self._template_elements is None:
+            # 組み込みの雛形はプレースホルダー入りのチケットで1度だけ組み立てる
+            self._template_elements = Presentation()
+            slide = self._template_elements.slides.add_slide(self._template_elements.slide_layouts[6])
+            self._build_template_slide(slide)
+        return self._template_elements.slides[0]
+    
+    def _build_template_slide(self, slide):
+        placeholder_issue = {
+            'id': '{{id}}',
+            'tracker': {'name': '{{tracker}}'},
+            'status': {'name': '{{status}}'},
+            'priority': {'name': '{{priority}}'},
+            'project': {'name': '{{project}}'},
+            'author': {'name': '{{author}}'},
+            'assigned_to': {'name': '{{assigned_to}}'},
+            'subject': '{{subject}}',
+            'description': '{{description}}',
+            'done_ratio': '{{done_ratio}}',
+            'start_date': '{{start_date}}',
+            'due_date': '{{due_date}}',
+            'spent_hours': '{{spent_hours}}',
+            'created_on': '{{created_on}}',
+            'updated_on': '{{updated_on}}',
+        }
+        self._add_header_section(slide, placeholder_issue)
+        self._add_title_section(slide, placeholder_issue)
+        self._add_project_section(slide, placeholder_issue)
+        self._add_description_section(slide, placeholder_issue)
+        # テンプレート方式では詳細の行位置を固定し、値が空の行も表示する
+        self._add_details_section(slide, placeholder_issue)
+        self._add_comments_section(slide, placeholder_issue, comments_text='{{comments}}')
+        self._add_footer_section(slide, placeholder_issue)
+    
+    def _template_fields(self, issue_data: Dict) -> Dict[str, str]:
+        def name_of(key: str, default: str = '') -> str:
+            return (issue_data.get(key) or {}).get('name', default)
+        
+        def timestamp(key: str) -> str:
+            return (issue_data.get(key) or '')[:19].replace('T', ' ')
+        
+        return {
+            'id': str(issue_data.get('id', '')),
+            'tracker': name_of('tracker', 'チケット'),
+            'status': name_of('status', '新規'),
+            'priority': name_of('priority'),
+            'project': name_of('project'),
+            'author': name_of('author'),
+            'assigned_to': name_of('assigned_to'),
+            'subject': issue_data.get('subject', ''),
+            'description': self._wrap_text(issue_data.get('description') or "説明なし", 80),
+            'done_ratio': str(issue_data.get('done_ratio', 0)),
+            'start_date': issue_data.get('start_date') or '',
+            'due_date': issue_data.get('due_date') or '',
+            'spent_hours': str(issue_data.get('spent_hours', 0)),
+            'created_on': timestamp('created_on'),
+            'updated_on': timestamp('updated_on'),
+            'comments': self._get_comments_text(issue_data),
+        }
+    
     def _add_header_section(self, slide, issue_data: Dict):
         # Bugラベル（赤背景）
         tracker_name = issue_data.get('tracker', {}).get('name', 'チケット')
@@ -182,7 +414,7 @@ class PowerPointGenerator:
                 
                 y_pos += 0.3
     
-    def _add_comments_section(self, slide, issue_data: Dict):
+    def _add_comments_section(self, slide, issue_data: Dict, comments_text: Optional[str] = None):
         # コメントヘッダー
         comment_header = slide.shapes.add_textbox(
             Inches(0.5), Inches(6.2), Inches(1.0), Inches(0.3)
@@ -201,7 +433,8 @@ class PowerPointGenerator:
         comment_box.line.dash_style = 7  # 点線
         
         # コメント取得と表示
-        comments_text = self._get_comments_text(issue_data)
+        if comments_text is None:
+            comments_text = self._get_comments_text(issue_data)
         comment_frame = comment_box.text_frame
         comment_frame.text = comments_text
         comment_frame.paragraphs[0].font.size = Pt(9)
@@ -273,7 +506,26 @@ class PowerPointGenerator:
         return '\n'.join(wrapped_lines)
     
     def _save_to_bytes(self) -> bytes:
+        if self.template is not None:
+            self._remove_template_slide()
         buffer = io.BytesIO()
         self.prs.save(buffer)
         buffer.seek(0)
-        return buffer.getvalue()
\ No newline at end of file
+        return buffer.getvalue()
+    
+    def _remove_template_slide(self):
+        """ブランド用テンプレートの雛形スライド（1枚目）を出力から取り除く"""
+        slide_ids = self.prs.slides._sldIdLst
+        template_slide_id = slide_ids[0]
+        self.prs.part.drop_rel(template_slide_id.rId)
+        slide_ids.remove(template_slide_id)
+
+def _render_batch_report(issues: List[Dict], use_template: bool = False,
+                         template: Optional[Union[str, bytes]] = None) -> bytes:
+    """プロセスプール用: チケット群を1つのプレゼンテーションとして描画"""
+    return PowerPointGenerator(use_template, template).create_batch_report(issues)
+
+def _render_issue_report(issue_data: Dict, use_template: bool = False,
+                         template: Optional[Union[str, bytes]] = None) -> bytes:
+    """プロセスプール用: 1チケット分の帳票を描画"""
+    return PowerPointGenerator(use_template, template).create_issue_report(issue_data)
\ No newline at end of file
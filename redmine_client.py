@@ -1,16 +1,199 @@
+import json
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+
+class IssueDetailCache:
+    """チケット詳細のLRUキャッシュ（TTL付き、updated_onが一致しないエントリは無効扱い）"""
+    
+    def __init__(self, max_size: int = 256, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, issue_id: int, updated_on: Optional[str] = None) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(issue_id)
+            if entry is not None:
+                fetched_at, data = entry
+                expired = time.monotonic() - fetched_at > self.ttl
+                outdated = updated_on is not None and data.get('updated_on') != updated_on
+                if not expired and not outdated:
+                    self._entries.move_to_end(issue_id)
+                    self.hits += 1
+                    return data
+                del self._entries[issue_id]
+            self.misses += 1
+            return None
+    
+    def contains(self, issue_id: int, updated_on: Optional[str] = None) -> bool:
+        """有効なエントリがあるか確認（ヒット・ミスの集計やLRU順には影響しない）"""
+        with self._lock:
+            entry = self._entries.get(issue_id)
+            if entry is None:
+                return False
+            fetched_at, data = entry
+            if time.monotonic() - fetched_at > self.ttl:
+                return False
+            return updated_on is None or data.get('updated_on') == updated_on
+    
+    def put(self, issue_id: int, data: Dict):
+        with self._lock:
+            self._entries[issue_id] = (time.monotonic(), data)
+            self._entries.move_to_end(issue_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
 
 class RedmineClient:
-    def __init__(self, base_url: str, api_key: str):
+    # リトライ対象のHTTPステータス（レート制限・サーバーエラー）
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    
+    # RedmineのJSONが返す日付・日時の書式
+    DATE_FORMAT = '%Y-%m-%d'
+    DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+    
+    # 名前列と対応するID列（名前はカテゴリ型、IDは整数で保持）
+    ID_COLUMNS = {
+        'プロジェクト': 'プロジェクトID',
+        'トラッカー': 'トラッカーID',
+        'ステータス': 'ステータスID',
+        '優先度': '優先度ID',
+        '作成者': '作成者ID',
+        '担当者': '担当者ID',
+        'バージョン': 'バージョンID',
+    }
+    
+    # マスタデータ（プロジェクト・ユーザー・ステータス・トラッカー・優先度）
+    REFERENCE_KEYS = ['projects', 'users', 'issue_statuses', 'trackers', 'issue_priorities']
+    
+    # カテゴリ型で保持する低カーディナリティ列
+    CATEGORICAL_COLUMNS = ['プロジェクト', 'ステータス', 'トラッカー', '優先度', '担当者', '作成者', 'バージョン']
+    
+    # コンパクトスキーマで除外する列と、ダウンキャスト先の型
+    HEAVY_COLUMNS = ['説明']
+    COMPACT_DTYPES = {
+        'ID': 'int32', '進捗率': 'int8', '予定工数': 'float32', '実績工数': 'float32',
+        **{col: 'Int32' for col in ID_COLUMNS.values()}
+    }
+    
+    def __init__(self, base_url: str, api_key: str, pool_size: int = 10,
+                 connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_factor: float = 0.5,
+                 reconcile_interval: float = 3600.0, store=None, compact_schema: bool = False,
+                 detail_cache_size: int = 256, detail_cache_ttl: float = 300.0,
+                 prefetch_workers: int = 4, reference_ttl: float = 86400.0,
+                 reference_retry_interval: float = 300.0):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.headers = {
             'X-Redmine-API-Key': api_key,
             'Content-Type': 'application/json'
         }
+        self.timeout = (connect_timeout, read_timeout)
+        self.backoff_factor = backoff_factor
+        self.session = self._create_session(pool_size, max_retries, backoff_factor)
+        
+        # 差分同期の状態（取得済みチケットの最大updated_onと最終突合時刻）
+        self.updated_on_watermark: Optional[str] = None
+        self.reconcile_interval = reconcile_interval
+        self.last_reconciled_at = 0.0
+        
+        # 永続ストア（IssueStore）。設定されていればローカルから先に読み込み、同期結果を書き戻す
+        self.store = store
+        # コンパクトスキーマ: 説明文を除外し数値列をダウンキャスト（説明文はget_descriptionで遅延取得）
+        self.compact_schema = compact_schema
+        self._sync_lock = threading.Lock()
+        self._background_sync = None
+        # 最後に同期したDataFrameとそのバージョン（全セッションで読み取り専用として共有する）
+        # バージョンは利用側のキャッシュキーになるため、作り直したクライアントでも重ならないよう現在時刻から始める
+        self._latest: Tuple[int, Optional[pd.DataFrame]] = (time.time_ns(), None)
+        # 初回読み込みを1回にまとめるための取得中のFuture（single-flight）
+        self._initial_load: Optional[Future] = None
+        # 最後に同期した時刻（スナップショットの鮮度表示用）
+        self.last_synced_at: Optional[float] = None
+        self.last_sync_error: Optional[str] = None
+        # セッションとは独立した定期更新スレッド
+        self._auto_refresh = None
+        self._auto_refresh_stop = threading.Event()
+        
+        # チケット詳細（journals付き）のキャッシュ
+        self.detail_cache = IssueDetailCache(detail_cache_size, detail_cache_ttl)
+        # 詳細の先読み用スレッドプールと取得中のリクエスト（同じチケットの重複取得を防ぐ）
+        self.prefetch_workers = prefetch_workers
+        self._prefetch_executor = None
+        self._inflight: Dict[int, Future] = {}
+        self._inflight_lock = threading.RLock()
+        
+        # マスタデータのキャッシュ（変更頻度が低いため長めのTTLで保持）
+        self.reference_ttl = reference_ttl
+        self._reference: Optional[Tuple[float, Dict[str, List[Dict]]]] = None
+        self._reference_lock = threading.Lock()
+        # 取得に失敗したら、この間隔が過ぎるまで再取得せず直前のデータ（またはエラー）を返す
+        self.reference_retry_interval = reference_retry_interval
+        self._reference_retry_at = 0.0
+        self._reference_error: Optional[str] = None
+    
+    def _create_session(self, pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+        """Keep-Alive付きのコネクションプールと指数バックオフ付きリトライを設定したセッションを作成"""
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        
+        session = requests.Session()
+        session.headers.update(self.headers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _get(self, path: str, params: Optional[Dict] = None) -> Dict:
+        response = self.session.get(
+            f"{self.base_url}{path}",
+            params=params,
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    def close(self):
+        """定期更新を止めて接続を閉じる（複数回呼ばれてもよい）"""
+        self.stop_auto_refresh()
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=False)
+            self._prefetch_executor = None
+        self.session.close()
     
     def get_issues(self, limit: int = 100, offset: int = 0, **kwargs) -> Dict:
         params = {
@@ -20,103 +203,732 @@ class RedmineClient:
         }
         
         try:
-            response = requests.get(
-                f"{self.base_url}/issues.json",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()
+            return self._get("/issues.json", params)
         except requests.exceptions.RequestException as e:
             raise Exception(f"チケット取得エラー: {e}")
     
-    def get_all_issues(self) -> List[Dict]:
+    def get_all_issues(self, parallel: bool = False, max_workers: int = 4, **kwargs) -> List[Dict]:
+        if parallel:
+            return self._get_all_issues_parallel(max_workers, **kwargs)
+        
         all_issues = []
         offset = 0
         limit = 100
         
         while True:
-            data = self.get_issues(limit=limit, offset=offset)
+            data = self.get_issues(limit=limit, offset=offset, **kwargs)
             issues = data.get('issues', [])
             
             if not issues:
                 break
-                
+            
             all_issues.extend(issues)
             
             if len(issues) < limit:
                 break
-                
+            
             offset += limit
         
         return all_issues
     
-    def get_issue_by_id(self, issue_id: int) -> Dict:
+    def _get_all_issues_parallel(self, max_workers: int, **kwargs) -> List[Dict]:
+        limit = 100
+        
+        # 1ページ目でtotal_countを取得
+        first_page = self.get_issues(limit=limit, offset=0, **kwargs)
+        all_issues = list(first_page.get('issues', []))
+        total_count = first_page.get('total_count', len(all_issues))
+        
+        offsets = list(range(limit, total_count, limit))
+        if not offsets:
+            return all_issues
+        
+        # 残りのページを並列取得（mapは入力順に結果を返すためページ順は維持される）
+        # 接続エラーや429/5xxの再試行はセッションのRetryが行うため、ここでは再試行しない
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            pages = executor.map(
+                lambda offset: self.get_issues(limit=limit, offset=offset, **kwargs),
+                offsets
+            )
+            for page in pages:
+                all_issues.extend(page.get('issues', []))
+        
+        return all_issues
+    
+    def get_issue_by_id(self, issue_id: int, updated_on=None, use_cache: bool = True) -> Dict:
+        """チケット詳細を取得（updated_onを渡すと、それより古いキャッシュは使わない）"""
+        issue_id = int(issue_id)
+        updated_on = self.to_redmine_timestamp(updated_on)
+        if use_cache:
+            cached = self.detail_cache.get(issue_id, updated_on)
+            if cached is not None:
+                return cached
+            # 先読み中であればその結果を待つ
+            with self._inflight_lock:
+                future = self._inflight.get(issue_id)
+            if future is not None:
+                issue = future.result()
+                if updated_on is None or issue.get('updated_on') == updated_on:
+                    return issue
+        
+        return self._fetch_issue_detail(issue_id)
+    
+    def _fetch_issue_detail(self, issue_id: int) -> Dict:
         try:
             params = {
                 'include': 'journals'
             }
-            response = requests.get(
-                f"{self.base_url}/issues/{issue_id}.json",
-                headers=self.headers,
-                params=params
-            )
-            response.raise_for_status()
-            return response.json()['issue']
+            issue = self._get(f"/issues/{issue_id}.json", params)['issue']
         except requests.exceptions.RequestException as e:
             raise Exception(f"チケット詳細取得エラー: {e}")
+        
+        self.detail_cache.put(issue_id, issue)
+        return issue
+    
+    def prefetch_issues(self, issue_ids: List[int], updated_on: Optional[Dict[int, object]] = None) -> List[Future]:
+        """チケット詳細をバックグラウンドで並列取得して詳細キャッシュに格納"""
+        updated_on = updated_on or {}
+        futures = []
+        with self._inflight_lock:
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=self.prefetch_workers, thread_name_prefix='redmine-prefetch'
+                )
+            for issue_id in issue_ids:
+                issue_id = int(issue_id)
+                expected = self.to_redmine_timestamp(updated_on.get(issue_id))
+                if issue_id in self._inflight or self.detail_cache.contains(issue_id, expected):
+                    continue
+                future = self._prefetch_executor.submit(self._fetch_issue_detail, issue_id)
+                self._inflight[issue_id] = future
+                # 既に完了していればこのスレッドで即時呼ばれるため、ロックは再入可能にしている
+                future.add_done_callback(lambda _, issue_id=issue_id: self._finish_prefetch(issue_id))
+                futures.append(future)
+        return futures
+    
+    def iter_issues_by_ids(self, issue_ids: List[int], updated_on: Optional[Dict[int, object]] = None,
+                           max_workers: int = 4) -> Iterator[Dict]:
+        """複数チケットの詳細を並列取得し、指定した順に1件ずつ返す（詳細キャッシュも利用）"""
+        updated_on = updated_on or {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            details = executor.map(
+                lambda issue_id: self.get_issue_by_id(issue_id, updated_on=updated_on.get(issue_id)),
+                [int(issue_id) for issue_id in issue_ids]
+            )
+            for issue in details:
+                yield issue
+    
+    def sync_status_history(self, df: pd.DataFrame, max_workers: int = 8, batch_size: int = 200,
+                            progress_callback=None) -> int:
+        """チケットのjournalsを並列取得し、ステータス変更履歴をストアに差分取り込み
+        
+        前回の取り込み以降にupdated_onが変わったチケットのみ取得する。取り込んだ件数を返す。
+        """
+        if self.store is None or df.empty:
+            return 0
+        
+        ingested = self.store.get_status_history_versions()
+        updated_on = df['更新日'].dt.strftime(self.DATETIME_FORMAT)
+        stale = updated_on.to_numpy() != df['ID'].map(ingested).to_numpy()
+        targets = df.loc[stale, 'ID'].astype(int).tolist()
+        target_updated_on = dict(zip(targets, updated_on[stale]))
+        
+        versions, events = {}, []
+        for count, issue in enumerate(self.iter_issues_by_ids(targets, target_updated_on, max_workers), 1):
+            versions[issue['id']] = issue.get('updated_on')
+            events.extend(self.status_events_from_issue(issue))
+            if len(versions) >= batch_size:
+                self.store.replace_status_events(versions, events)
+                versions, events = {}, []
+            if progress_callback:
+                progress_callback(count, len(targets))
+        self.store.replace_status_events(versions, events)
+        return len(targets)
+    
+    @classmethod
+    def status_events_from_issue(cls, issue: Dict) -> List[tuple]:
+        """journalsのstatus_id変更を (issue_id, journal_id, UNIX秒, 変更前, 変更後) の行に変換
+        
+        作成時点のステータスはjournal_id=0の行として、最初の変更の変更前ステータス（変更がなければ現在のステータス）を記録する。
+        """
+        def epoch(value: str) -> int:
+            return int(datetime.strptime(value, cls.DATETIME_FORMAT).replace(tzinfo=timezone.utc).timestamp())
+        
+        issue_id = issue['id']
+        changes = []
+        for journal in issue.get('journals', []):
+            for detail in journal.get('details', []):
+                if detail.get('property') == 'attr' and detail.get('name') == 'status_id' and detail.get('new_value'):
+                    old_value = detail.get('old_value')
+                    changes.append((
+                        issue_id,
+                        journal['id'],
+                        epoch(journal['created_on']),
+                        int(old_value) if old_value else None,
+                        int(detail['new_value'])
+                    ))
+        changes.sort(key=lambda row: (row[2], row[1]))
+        
+        initial_status = changes[0][3] if changes and changes[0][3] is not None else issue['status']['id']
+        return [(issue_id, 0, epoch(issue['created_on']), None, initial_status)] + changes
+    
+    def _finish_prefetch(self, issue_id: int):
+        with self._inflight_lock:
+            self._inflight.pop(issue_id, None)
+    
+    def _get_all_pages(self, path: str, key: str, limit: int = 100) -> List[Dict]:
+        """offset/limitでページングされる一覧を全件取得（total_countを返さない一覧は1回で終了）"""
+        items = []
+        offset = 0
+        while True:
+            data = self._get(path, {'limit': limit, 'offset': offset})
+            page = data.get(key, [])
+            items.extend(page)
+            offset += limit
+            if not page or 'total_count' not in data or offset >= data['total_count']:
+                break
+        return items
     
     def get_projects(self) -> List[Dict]:
         try:
-            response = requests.get(
-                f"{self.base_url}/projects.json",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json().get('projects', [])
+            return self._get_all_pages("/projects.json", 'projects')
         except requests.exceptions.RequestException as e:
             raise Exception(f"プロジェクト取得エラー: {e}")
     
     def get_users(self) -> List[Dict]:
         try:
-            response = requests.get(
-                f"{self.base_url}/users.json",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json().get('users', [])
+            return self._get_all_pages("/users.json", 'users')
         except requests.exceptions.RequestException as e:
             raise Exception(f"ユーザー取得エラー: {e}")
     
+    def get_issue_statuses(self) -> List[Dict]:
+        try:
+            return self._get("/issue_statuses.json").get('issue_statuses', [])
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"ステータス取得エラー: {e}")
+    
+    def get_trackers(self) -> List[Dict]:
+        try:
+            return self._get("/trackers.json").get('trackers', [])
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"トラッカー取得エラー: {e}")
+    
+    def get_issue_priorities(self) -> List[Dict]:
+        try:
+            return self._get("/enumerations/issue_priorities.json").get('issue_priorities', [])
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"優先度取得エラー: {e}")
+    
+    def get_reference_data(self, force: bool = False) -> Dict[str, List[Dict]]:
+        """マスタデータをまとめて取得（メモリとローカルストアにreference_ttl秒キャッシュ）
+        
+        取得に失敗した場合はTTLを過ぎたデータでも返し続け、reference_retry_interval秒は再取得しない
+        （Redmineに接続できない間、再実行のたびにタイムアウトを待たない）。
+        """
+        with self._reference_lock:
+            if not force and self._reference is None and self.store is not None:
+                stored = self.store.get_meta('reference_data')
+                if stored:
+                    fetched_at, data = json.loads(stored)
+                    self._reference = (fetched_at, data)
+            backing_off = time.time() < self._reference_retry_at
+            if not force and self._reference is not None:
+                fetched_at, data = self._reference
+                if backing_off or time.time() - fetched_at < self.reference_ttl:
+                    return data
+            if not force and backing_off:
+                raise Exception(f"マスタデータ取得エラー: {self._reference_error}")
+            
+            try:
+                data = self._fetch_reference_data()
+            except Exception as e:
+                self._reference_retry_at = time.time() + self.reference_retry_interval
+                self._reference_error = str(e)
+                if self._reference is not None:
+                    return self._reference[1]
+                raise
+            
+            fetched_at = time.time()
+            self._reference = (fetched_at, data)
+            self._reference_retry_at = 0.0
+            self._reference_error = None
+            if self.store is not None:
+                self.store.set_meta('reference_data', json.dumps([fetched_at, data], ensure_ascii=False))
+            return data
+    
+    def _fetch_reference_data(self) -> Dict[str, List[Dict]]:
+        data = {
+            'projects': self.get_projects(),
+            'issue_statuses': self.get_issue_statuses(),
+            'trackers': self.get_trackers(),
+            'issue_priorities': self.get_issue_priorities(),
+        }
+        try:
+            data['users'] = self.get_users()
+        except Exception:
+            # ユーザー一覧は管理者権限が必要なため、取得できなくても続行する
+            data['users'] = []
+        return data
+    
+    def closed_status_names(self) -> Optional[set]:
+        """is_closedが設定されたステータス名（マスタデータを取得できない場合はNone）"""
+        try:
+            statuses = self.get_reference_data()['issue_statuses']
+        except Exception:
+            return None
+        return {status['name'] for status in statuses if status.get('is_closed')}
+    
+    def get_time_entries(self, limit: int = 100, offset: int = 0, **kwargs) -> Dict:
+        params = {
+            'limit': limit,
+            'offset': offset,
+            **kwargs
+        }
+        
+        try:
+            return self._get("/time_entries.json", params)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"作業時間取得エラー: {e}")
+    
+    def get_all_time_entries(self, max_workers: int = 4, **kwargs) -> List[Dict]:
+        """作業時間を全件取得（1ページ目のtotal_countをもとに残りのページを並列取得）"""
+        limit = 100
+        first_page = self.get_time_entries(limit=limit, offset=0, **kwargs)
+        entries = list(first_page.get('time_entries', []))
+        offsets = list(range(limit, first_page.get('total_count', len(entries)), limit))
+        if not offsets:
+            return entries
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            pages = executor.map(
+                lambda offset: self.get_time_entries(limit=limit, offset=offset, **kwargs),
+                offsets
+            )
+            for page in pages:
+                entries.extend(page.get('time_entries', []))
+        return entries
+    
+    def sync_time_entries(self, max_workers: int = 4, overlap_days: int = 14, full: bool = False) -> int:
+        """作業時間をspent_onの期間単位で差分取得し、ストアの集計を更新（取得件数を返す）
+        
+        過去日付での登録・修正に備えて、前回の取得日からoverlap_days日さかのぼった期間を取り直す。
+        """
+        if self.store is None:
+            raise Exception("作業時間の取り込みにはローカルストアが必要です")
+        
+        synced_on = None if full else self.store.get_meta('time_entries_synced_on')
+        today = datetime.now().strftime(self.DATE_FORMAT)
+        since = None
+        params = {}
+        if synced_on:
+            since = (datetime.strptime(synced_on, self.DATE_FORMAT) - timedelta(days=overlap_days)).strftime(self.DATE_FORMAT)
+            params['from'] = since
+        
+        entries = self.get_all_time_entries(max_workers=max_workers, **params)
+        self.store.replace_time_entries(entries, since)
+        self.store.set_meta('time_entries_synced_on', today)
+        return len(entries)
+    
+    @staticmethod
+    def build_issue_filters(project_id: Optional[int] = None, status_id=None,
+                            updated_from=None, updated_to=None) -> Dict:
+        """画面のフィルター条件を/issues.jsonの検索パラメータに変換"""
+        filters = {}
+        if project_id is not None:
+            filters['project_id'] = project_id
+        if status_id is not None:
+            filters['status_id'] = status_id
+        if updated_from and updated_to:
+            filters['updated_on'] = f"><{updated_from.isoformat()}|{updated_to.isoformat()}"
+        elif updated_from:
+            filters['updated_on'] = f">={updated_from.isoformat()}"
+        elif updated_to:
+            filters['updated_on'] = f"<={updated_to.isoformat()}"
+        return filters
+    
+    def sync_issues(self, max_workers: int = 4, force_reconcile: bool = False, **kwargs) -> pd.DataFrame:
+        """updated_onのウォーターマーク以降に更新されたチケットだけを取得して共有中のDataFrameにマージ
+        
+        ウォーターマークはクライアント全体で1つのため、マージ先はロック内で取得した最新の共有データに限る
+        （呼び出し側が読み込んだ時点のDataFrameにマージすると、先に完了した同期の更新が失われる）。
+        """
+        with self._sync_lock:
+            df = self.latest_issues if self.latest_issues is not None else self.load_cached_issues()
+            synced = self._sync_issues(df, max_workers, force_reconcile, **kwargs)
+            self._publish(synced)
+            self.last_synced_at = time.time()
+            self.last_sync_error = None
+            if self.store is not None:
+                self.store.set_meta('last_synced_at', str(self.last_synced_at))
+            return synced
+    
+    def _sync_issues(self, df: Optional[pd.DataFrame], max_workers: int,
+                     force_reconcile: bool, **kwargs) -> pd.DataFrame:
+        if df is not None and not df.empty and self.updated_on_watermark is None:
+            self.updated_on_watermark = self._watermark_from_dataframe(df)
+        
+        if df is None or df.empty or self.updated_on_watermark is None:
+            issues = self.get_all_issues(parallel=True, max_workers=max_workers, **kwargs)
+            self.updated_on_watermark = None
+            self._advance_watermark(issues)
+            self.last_reconciled_at = time.time()
+            df = self.issues_to_dataframe(issues)
+            if self.store is not None:
+                today = datetime.now().strftime(self.DATE_FORMAT)
+                dropped_ids = self.store.replace_issues(issues)
+                self.store.record_issue_states(issues, today)
+                # 前回の取得結果から消えたチケットは推移グラフの件数からも除く
+                self.store.remove_issue_states(dropped_ids, today)
+                self.store.write_snapshot(df)
+                self._save_sync_state()
+            return df
+        
+        since = f">={self.updated_on_watermark}"
+        # フィルター条件に一致する更新チケット
+        current = self.get_all_issues(parallel=True, max_workers=max_workers, updated_on=since, **kwargs)
+        # ステータスを問わず更新されたチケット（終了などで条件から外れたものを検出する）
+        changed = self.get_all_issues(
+            parallel=True, max_workers=max_workers, updated_on=since, **{**kwargs, 'status_id': '*'}
+        )
+        
+        # 条件は「以上」のため、ウォーターマークと同時刻のチケットは毎回返ってくる
+        # 保持中の行と更新日時が同じものは変更なしとして除き、何も変わらない同期では元のDataFrameを返す
+        held = self._held_updated_on(df, changed)
+        current = [issue for issue in current if held.get(issue['id']) != issue.get('updated_on')]
+        changed = [issue for issue in changed if held.get(issue['id']) != issue.get('updated_on')]
+        
+        current_ids = {issue['id'] for issue in current}
+        # 保持していないチケットは除外済みのため、削除対象には含めない
+        removed_ids = [issue['id'] for issue in changed if issue['id'] not in current_ids and issue['id'] in held]
+        synced = self.merge_issues(df, current, removed_ids)
+        self._advance_watermark(changed)
+        if self.store is not None:
+            # 推移グラフ用の日次件数には、条件から外れた（終了など）チケットも含めて反映する
+            today = datetime.now().strftime(self.DATE_FORMAT)
+            if not self.store.has_issue_states():
+                # 記録を始める前に保存済みのチケットで現在の件数を初期化する（初回のみ全件）
+                self.store.record_issue_states(self.store.load_issues(), today)
+            self.store.upsert_issues(current)
+            self.store.record_issue_states(changed, today)
+            self.store.delete_issues(removed_ids)
+        
+        # 削除・移動されたチケットは定期的にID一覧で突合する
+        if force_reconcile or time.time() - self.last_reconciled_at >= self.reconcile_interval:
+            synced = self.reconcile_issues(synced, max_workers=max_workers, **kwargs)
+        
+        if self.store is not None:
+            # 変更がなければスナップショットは書き換えない
+            if synced is not df:
+                self.store.write_snapshot(synced)
+            self._save_sync_state()
+        return synced
+    
+    def load_cached_issues(self) -> Optional[pd.DataFrame]:
+        """永続ストアのスナップショットを読み込み、同期状態を復元（ストアが空ならNone）"""
+        if self.store is None:
+            return None
+        df = self.store.load_snapshot()
+        if df is None:
+            return None
+        if any(col not in df.columns for col in self.ID_COLUMNS.values()):
+            # ID列を持たない古いスナップショットは、保存済みの生JSONから作り直す
+            df = self.issues_to_dataframe(self.store.load_issues())
+            self.store.write_snapshot(df)
+        if self.compact_schema:
+            # スキーマ切り替え前のスナップショットにも対応する
+            df = self.compact_dataframe(df)
+        self.updated_on_watermark = self.store.get_meta('updated_on_watermark')
+        self.last_reconciled_at = float(self.store.get_meta('last_reconciled_at') or 0.0)
+        last_synced_at = self.store.get_meta('last_synced_at')
+        self.last_synced_at = float(last_synced_at) if last_synced_at else None
+        self._publish(df)
+        return df
+    
+    @property
+    def latest_issues(self) -> Optional[pd.DataFrame]:
+        return self._latest[1]
+    
+    def get_latest_issues(self) -> Tuple[int, Optional[pd.DataFrame]]:
+        """共有中のDataFrameとそのバージョンを組で返す（両者は常に対応する）"""
+        return self._latest
+    
+    def _publish(self, df: pd.DataFrame):
+        # 内容が変わらない同期ではバージョンを進めず、利用側のキャッシュを生かす
+        with self._inflight_lock:
+            version, current = self._latest
+            if df is not current:
+                self._latest = (version + 1, df)
+    
+    def load_shared_issues(self, max_workers: int = 4) -> Tuple[int, pd.DataFrame]:
+        """全セッションで共有するチケット一覧を返す
+        
+        同時に呼ばれた初回読み込みは1回の取得にまとめ、待機側も同じDataFrameを受け取る（コピーしない）。
+        ローカルストアにスナップショットがあればそれを返し、差分同期はバックグラウンドで行う。
+        """
+        with self._inflight_lock:
+            if self.latest_issues is not None:
+                return self._latest
+            future = self._initial_load
+            leader = future is None
+            if leader:
+                future = self._initial_load = Future()
+        
+        if not leader:
+            future.result()
+            return self._latest
+        
+        try:
+            df = self.load_cached_issues()
+            if df is not None:
+                self.sync_in_background(max_workers=max_workers)
+            else:
+                # 初回はページを並列取得し、差分同期用のウォーターマークを記録
+                self.sync_issues(max_workers=max_workers)
+            future.set_result(None)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._initial_load = None
+        return self._latest
+    
+    def sync_in_background(self, max_workers: int = 4, **kwargs) -> bool:
+        """差分同期をバックグラウンドスレッドで開始（実行中なら何もしない）"""
+        if self._background_sync is not None and self._background_sync.is_alive():
+            return False
+        
+        def run():
+            try:
+                self.sync_issues(max_workers=max_workers, **kwargs)
+            except Exception as e:
+                # 同期に失敗しても既存のスナップショットで表示を継続する
+                self.last_sync_error = str(e)
+        
+        self._background_sync = threading.Thread(target=run, name='redmine-sync', daemon=True)
+        self._background_sync.start()
+        return True
+    
+    def start_auto_refresh(self, interval: float, max_workers: int = 4, **kwargs) -> bool:
+        """interval秒ごとに差分同期するスレッドを開始（実行中なら何もしない）
+        
+        同期中も利用者には直前のスナップショットを返し、完了後にスナップショットを差し替える。
+        """
+        if self._auto_refresh is not None and self._auto_refresh.is_alive():
+            return False
+        
+        self._auto_refresh_stop.clear()
+        
+        def run():
+            while not self._auto_refresh_stop.wait(interval):
+                try:
+                    self.sync_issues(max_workers=max_workers, **kwargs)
+                except Exception as e:
+                    # 失敗しても次の周期で再試行し、それまでは既存のスナップショットを使う
+                    self.last_sync_error = str(e)
+        
+        self._auto_refresh = threading.Thread(target=run, name='redmine-auto-refresh', daemon=True)
+        self._auto_refresh.start()
+        return True
+    
+    def stop_auto_refresh(self):
+        self._auto_refresh_stop.set()
+    
+    def is_syncing(self) -> bool:
+        return self._sync_lock.locked()
+    
+    def snapshot_age(self) -> Optional[float]:
+        """最後に同期してからの経過秒数（未同期ならNone）"""
+        return time.time() - self.last_synced_at if self.last_synced_at is not None else None
+    
+    def snapshot_version(self) -> Optional[int]:
+        return self.store.snapshot_version() if self.store is not None else None
+    
+    def _save_sync_state(self):
+        self.store.set_meta('updated_on_watermark', self.updated_on_watermark)
+        self.store.set_meta('last_reconciled_at', str(self.last_reconciled_at))
+    
+    def merge_issues(self, df: pd.DataFrame, issues: List[Dict],
+                     removed_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """IDをキーに更新チケットを上書きし、removed_idsのチケットを除外"""
+        drop_ids = set(removed_ids or [])
+        if issues:
+            delta = self.issues_to_dataframe(issues)
+            drop_ids.update(delta['ID'])
+        if not drop_ids:
+            return df
+        
+        merged = df[~df['ID'].isin(drop_ids)]
+        if issues:
+            # カテゴリの集合が異なるとconcatでobject型に戻るため再変換する
+            merged = self.categorize_columns(pd.concat([merged, delta], ignore_index=True))
+        # Redmineのデフォルト順（ID降順）に揃える
+        return merged.sort_values('ID', ascending=False).reset_index(drop=True)
+    
+    def get_all_issue_ids(self, max_workers: int = 4, **kwargs) -> set:
+        """チケットIDのみを収集（DataFrameは構築しない）"""
+        issues = self.get_all_issues(parallel=True, max_workers=max_workers, **kwargs)
+        return {issue['id'] for issue in issues}
+    
+    def reconcile_issues(self, df: pd.DataFrame, max_workers: int = 4, **kwargs) -> pd.DataFrame:
+        """サーバー上に存在しなくなった（削除・移動・権限外）チケットを除外"""
+        live_ids = self.get_all_issue_ids(max_workers=max_workers, **kwargs)
+        self.last_reconciled_at = time.time()
+        stale = ~df['ID'].isin(live_ids)
+        if not stale.any():
+            return df
+        if self.store is not None:
+            stale_ids = df.loc[stale, 'ID'].tolist()
+            self.store.delete_issues(stale_ids)
+            self.store.remove_issue_states(stale_ids, datetime.now().strftime(self.DATE_FORMAT))
+        return df[~stale].reset_index(drop=True)
+    
+    def _advance_watermark(self, issues: List[Dict]):
+        updated = [issue.get('updated_on') for issue in issues if issue.get('updated_on')]
+        if updated:
+            latest = max(updated)
+            if self.updated_on_watermark is None or latest > self.updated_on_watermark:
+                self.updated_on_watermark = latest
+    
+    def _held_updated_on(self, df: pd.DataFrame, issues: List[Dict]) -> Dict[int, Optional[str]]:
+        """issuesのうちdfが保持しているチケットについて、ID→更新日時（RedmineのJSONと同じ形式）を返す"""
+        rows = df.loc[df['ID'].isin([issue['id'] for issue in issues]), ['ID', '更新日']]
+        return {int(issue_id): self.to_redmine_timestamp(updated_on) for issue_id, updated_on in rows.itertuples(index=False)}
+    
+    def _watermark_from_dataframe(self, df: pd.DataFrame) -> Optional[str]:
+        return self.to_redmine_timestamp(df['更新日'].max())
+    
+    @classmethod
+    def to_redmine_timestamp(cls, value) -> Optional[str]:
+        """TimestampなどをRedmineのJSONと同じUTC日時文字列に変換"""
+        if value is None or isinstance(value, str):
+            return value
+        if pd.isna(value):
+            return None
+        value = pd.Timestamp(value)
+        if value.tzinfo is not None:
+            value = value.tz_convert('UTC')
+        return value.strftime(cls.DATETIME_FORMAT)
+    
     def issues_to_dataframe(self, issues: List[Dict]) -> pd.DataFrame:
-        data = []
-        
-        for issue in issues:
-            row = {
-                'ID': issue.get('id'),
-                'プロジェクト': issue.get('project', {}).get('name', ''),
-                'トラッカー': issue.get('tracker', {}).get('name', ''),
-                'ステータス': issue.get('status', {}).get('name', ''),
-                '優先度': issue.get('priority', {}).get('name', ''),
-                '件名': issue.get('subject', ''),
-                '説明': issue.get('description', ''),
-                '作成者': issue.get('author', {}).get('name', ''),
-                '担当者': issue.get('assigned_to', {}).get('name', '') if issue.get('assigned_to') else '',
-                '開始日': issue.get('start_date', ''),
-                '期限日': issue.get('due_date', ''),
-                '進捗率': issue.get('done_ratio', 0),
-                '予定工数': issue.get('estimated_hours', 0) or 0,
-                '実績工数': issue.get('spent_hours', 0) or 0,
-                '作成日': issue.get('created_on', ''),
-                '更新日': issue.get('updated_on', ''),
-                '終了日': issue.get('closed_on', ''),
-                'プライベート': issue.get('is_private', False)
-            }
-            data.append(row)
+        """チケット一覧をDataFrameに変換（行ごとのdictを作らず列単位で抽出）"""
+        empty = {}
+        
+        def nested(key: str) -> Tuple[pd.Categorical, pd.arrays.IntegerArray]:
+            # IDだけを1回のループで取り出し、欠損は0としてマスクで表す（RedmineのIDは1以上）
+            ids = np.fromiter([(issue.get(key) or empty).get('id') or 0 for issue in issues], dtype='int64', count=len(issues))
+            # 名前はIDごとに最初の1件から引き、コードを組み替えてカテゴリ型にする（文字列配列を経由しない）
+            _, first, codes = np.unique(ids, return_index=True, return_inverse=True)
+            names = np.array([(issues[index].get(key) or empty).get('name', '') for index in first], dtype=object)
+            categories, name_codes = np.unique(names, return_inverse=True)
+            return (
+                pd.Categorical.from_codes(name_codes[codes], categories=categories),
+                pd.arrays.IntegerArray(ids, ids == 0)
+            )
+        
+        project, tracker, status, priority, author, assigned_to, fixed_version = (
+            nested(key) for key in ['project', 'tracker', 'status', 'priority', 'author', 'assigned_to', 'fixed_version']
+        )
+        
+        def field(key: str, default=None) -> list:
+            return [issue.get(key, default) for issue in issues]
         
-        df = pd.DataFrame(data)
+        def number(key: str, dtype: str) -> np.ndarray:
+            # 欠損は0とし、pd.arrayでの型判定を経由せずにnumpy配列を作る
+            return np.fromiter([issue.get(key) or 0 for issue in issues], dtype=dtype, count=len(issues))
+        
+        def parse_dates(key: str, date_format: str, utc: bool = False) -> pd.DatetimeIndex:
+            values = field(key)
+            try:
+                # Redmineの日付・UTC日時（末尾Z）はnumpyのISO形式の解析で直接変換する（書式指定のto_datetimeより高速）
+                if utc:
+                    if not all(value.endswith('Z') for value in values if value):
+                        raise ValueError(key)
+                    values = [value[:-1] if value else None for value in values]
+                parsed = pd.DatetimeIndex(np.array(values, dtype='datetime64[ns]'))
+                return parsed.tz_localize('UTC') if utc else parsed
+            except ValueError:
+                # 想定外の書式を含む場合は、書式を明示して解析できない値を欠損にする
+                parsed = pd.to_datetime(field(key), format=date_format, utc=utc, errors='coerce')
+                return parsed.as_unit('ns')
+        
+        columns = {
+            'ID': pd.array(field('id'), dtype='int64'),
+            'プロジェクト': project[0],
+            'トラッカー': tracker[0],
+            'ステータス': status[0],
+            '優先度': priority[0],
+            '件名': field('subject', ''),
+            # コンパクトスキーマでは除外する重い列のため、最初から作らない
+            **({} if self.compact_schema else {'説明': field('description', '')}),
+            '作成者': author[0],
+            '担当者': assigned_to[0],
+            'バージョン': fixed_version[0],
+            '開始日': parse_dates('start_date', self.DATE_FORMAT),
+            '期限日': parse_dates('due_date', self.DATE_FORMAT),
+            '進捗率': number('done_ratio', 'int64'),
+            '予定工数': number('estimated_hours', 'float64'),
+            '実績工数': number('spent_hours', 'float64'),
+            '作成日': parse_dates('created_on', self.DATETIME_FORMAT, utc=True),
+            '更新日': parse_dates('updated_on', self.DATETIME_FORMAT, utc=True),
+            '終了日': parse_dates('closed_on', self.DATETIME_FORMAT, utc=True),
+            'プライベート': pd.array([bool(value) for value in field('is_private', False)], dtype='bool'),
+            'プロジェクトID': project[1],
+            'トラッカーID': tracker[1],
+            'ステータスID': status[1],
+            '優先度ID': priority[1],
+            '作成者ID': author[1],
+            '担当者ID': assigned_to[1],
+            'バージョンID': fixed_version[1],
+        }
+        
+        df = self.categorize_columns(pd.DataFrame(columns))
+        if self.compact_schema:
+            df = self.compact_dataframe(df)
+        return df
+    
+    @classmethod
+    def categorize_columns(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """低カーディナリティ列をカテゴリ型に変換（concat後などで型が崩れた場合にも使用）"""
+        for col in cls.CATEGORICAL_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+        return df
+    
+    @classmethod
+    def compact_dataframe(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """重い列を除外し、数値列を必要最小限の型にダウンキャスト"""
+        df = df.drop(columns=[col for col in cls.HEAVY_COLUMNS if col in df.columns])
+        return df.astype({col: dtype for col, dtype in cls.COMPACT_DTYPES.items() if col in df.columns})
+    
+    @staticmethod
+    def memory_per_issue(df: pd.DataFrame) -> float:
+        """1チケットあたりのメモリ使用量（バイト）"""
+        if df.empty:
+            return 0.0
+        return df.memory_usage(deep=True).sum() / len(df)
+    
+    def get_description(self, issue_id: int) -> str:
+        """説明文を取得（ローカルストアを優先し、なければAPIから取得）"""
+        return self.get_descriptions([issue_id]).get(int(issue_id), '')
+    
+    def get_descriptions(self, issue_ids: List[int], batch_size: int = 100, max_workers: int = 4) -> Dict[int, str]:
+        """説明文をストアから取得し、ストアにないチケット（サーバー側絞り込みの結果など）はまとめて取得"""
+        ids = [int(issue_id) for issue_id in issue_ids]
+        descriptions = self.store.get_descriptions(ids) if self.store is not None else {}
+        missing = [issue_id for issue_id in ids if issue_id not in descriptions]
+        if not missing:
+            return descriptions
         
-        for date_col in ['開始日', '期限日', '作成日', '更新日', '終了日']:
-            df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        # issue_idの一覧指定で取得する（終了済みも含めるためstatus_idは*）
+        batches = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+        fetch = lambda batch: self.get_all_issues(issue_id=','.join(map(str, batch)), status_id='*')
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for issues in executor.map(fetch, batches):
+                for issue in issues:
+                    descriptions[issue['id']] = issue.get('description') or ''
         
-        return df
\ No newline at end of file
+        not_found = [issue_id for issue_id in missing if issue_id not in descriptions]
+        if not_found:
+            raise Exception(f"説明取得エラー: {len(not_found)}件のチケットを取得できませんでした（ID: {', '.join(map(str, not_found[:10]))}）")
+        return descriptions
\ No newline at end of file
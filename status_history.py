@@ -0,0 +1,155 @@
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+class StatusHistory:
+    """ステータス変更履歴（IssueStore.load_status_eventsの列指向テーブル）の集計
+    
+    行ごとのループを使わず、チケット・時刻順に並んだ配列のずらし比較で区間を求めるため、
+    数百万行の履歴でも一括で計算できる。
+    """
+    
+    SECONDS_PER_DAY = 86400
+    
+    def __init__(self, events: pd.DataFrame):
+        self.events = events.sort_values(['issue_id', 'changed_on', 'journal_id'], kind='stable').reset_index(drop=True)
+    
+    @property
+    def empty(self) -> bool:
+        return self.events.empty
+    
+    def for_issues(self, issue_ids: Iterable[int]) -> 'StatusHistory':
+        """指定したチケットの履歴のみに絞り込む"""
+        return StatusHistory(self.events[self.events['issue_id'].isin(list(issue_ids))])
+    
+    def intervals(self, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """各ステータスの滞在区間（開始・終了のUNIX秒）。最後の区間はnowまで"""
+        now_epoch = int((now or pd.Timestamp.now(tz='UTC')).timestamp())
+        issue_ids = self.events['issue_id'].to_numpy()
+        starts = self.events['changed_on'].to_numpy()
+        
+        ends = np.empty_like(starts)
+        ends[:-1] = starts[1:]
+        # 次の行が別のチケットなら、その区間は現在まで続いている
+        last_of_issue = np.ones(len(starts), dtype=bool)
+        last_of_issue[:-1] = issue_ids[1:] != issue_ids[:-1]
+        ends[last_of_issue] = now_epoch
+        
+        return pd.DataFrame({
+            'issue_id': issue_ids,
+            'status_id': self.events['new_status_id'].to_numpy(),
+            'start': starts,
+            'end': ends,
+        })
+    
+    def time_in_status(self, now: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """ステータスごとの滞在日数（そのステータスを経由したチケット数・平均・中央値）"""
+        if self.empty:
+            return pd.DataFrame(columns=['チケット数', '平均日数', '中央値日数'])
+        
+        intervals = self.intervals(now)
+        intervals['days'] = (intervals['end'] - intervals['start']) / self.SECONDS_PER_DAY
+        # 同じステータスに複数回入ったチケットは合計日数で数える
+        per_issue = intervals.groupby(['status_id', 'issue_id'], sort=False)['days'].sum()
+        summary = per_issue.groupby(level='status_id').agg(['count', 'mean', 'median'])
+        summary.columns = ['チケット数', '平均日数', '中央値日数']
+        return summary
+    
+    def lead_and_cycle_times(self, closed_status_ids: Iterable[int]) -> pd.DataFrame:
+        """完了したチケットのリードタイム（作成→完了）とサイクルタイム（最初の状態変更→完了）を日数で返す"""
+        columns = ['リードタイム', 'サイクルタイム']
+        if self.empty:
+            return pd.DataFrame(columns=columns)
+        
+        events = self.events
+        changed_on = events['changed_on']
+        closed = events['new_status_id'].isin(list(closed_status_ids)) & (events['journal_id'] != 0)
+        
+        created = changed_on[events['journal_id'] == 0].groupby(events['issue_id']).min()
+        started = changed_on[events['journal_id'] != 0].groupby(events['issue_id']).min()
+        finished = changed_on[closed].groupby(events['issue_id']).min()
+        
+        times = pd.DataFrame({
+            'リードタイム': finished - created.reindex(finished.index),
+            'サイクルタイム': finished - started.reindex(finished.index),
+        })
+        return times / self.SECONDS_PER_DAY
+    
+    def cumulative_flow(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                        freq: str = 'D') -> pd.DataFrame:
+        """日ごと（freq単位）のステータス別チケット数（行: 日付、列: ステータスID）
+        
+        各変更を「変更後ステータスに+1、変更前ステータスに-1」の増減として集計し、累積和で求める。
+        """
+        if self.empty:
+            return pd.DataFrame()
+        
+        events = self.events
+        dates = pd.to_datetime(events['changed_on'], unit='s', utc=True).dt.tz_localize(None).dt.floor(freq)
+        entered = pd.DataFrame({'date': dates, 'status_id': events['new_status_id'], 'delta': 1})
+        left = pd.DataFrame({'date': dates, 'status_id': events['old_status_id'], 'delta': -1}).dropna()
+        deltas = pd.concat([entered, left], ignore_index=True).astype({'status_id': 'int64'})
+        
+        daily = deltas.pivot_table(index='date', columns='status_id', values='delta', aggfunc='sum', fill_value=0)
+        index = pd.date_range(
+            daily.index.min() if start is None else pd.Timestamp(start).floor(freq),
+            pd.Timestamp.now().floor(freq) if end is None else pd.Timestamp(end).floor(freq),
+            freq=freq
+        )
+        # 表示開始より前の変更は初日の値に含める
+        before = daily[daily.index < index[0]].sum()
+        flow = daily.reindex(index, fill_value=0)
+        if not flow.empty:
+            flow.iloc[0] += before
+        return flow.cumsum()
+    
+    @staticmethod
+    def name_statuses(frame: pd.DataFrame, status_names: Dict[int, str], axis: int = 0) -> pd.DataFrame:
+        """ステータスIDの行（axis=0）または列（axis=1）をステータス名に置き換え"""
+        mapper = lambda status_id: status_names.get(int(status_id), str(status_id))
+        return frame.rename(index=mapper) if axis == 0 else frame.rename(columns=mapper)
+
+class DailyStatusCounts:
+    """同期ごとに記録した日次スナップショット（IssueStore.load_daily_status_counts）から推移を求める
+    
+    スナップショットは変化のあったプロジェクト×ステータスの行のみを持つため、
+    日付×(プロジェクト, ステータス)の表にして前日の値で埋める。計算量は日数×組み合わせ数で、履歴の件数によらない。
+    """
+    
+    def __init__(self, counts: pd.DataFrame):
+        self.counts = counts
+    
+    @property
+    def empty(self) -> bool:
+        return self.counts.empty
+    
+    def _filled(self, value: str, project_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        counts = self.counts
+        if project_ids is not None:
+            counts = counts[counts['project_id'].isin(list(project_ids))]
+        if counts.empty:
+            return pd.DataFrame()
+        
+        table = counts.pivot_table(index='day', columns=['project_id', 'status_id'], values=value, aggfunc='last')
+        days = pd.date_range(table.index.min(), max(table.index.max(), pd.Timestamp.now().normalize()), freq='D')
+        return table.reindex(days).ffill().fillna(0)
+    
+    def by_status(self, project_ids: Optional[Iterable[int]] = None, value: str = 'issue_count') -> pd.DataFrame:
+        """日ごとのステータス別の値（行: 日付、列: ステータスID）"""
+        table = self._filled(value, project_ids)
+        if table.empty:
+            return table
+        return table.T.groupby(level='status_id').sum().T
+    
+    def burndown(self, open_status_ids: Iterable[int], project_ids: Optional[Iterable[int]] = None) -> pd.DataFrame:
+        """日ごとの未完了チケット数と未完了チケットの予定工数"""
+        open_status_ids = list(open_status_ids)
+        counts = self.by_status(project_ids, 'issue_count')
+        if counts.empty:
+            return pd.DataFrame(columns=['未完了チケット数', '残予定工数'])
+        hours = self.by_status(project_ids, 'estimated_hours')
+        return pd.DataFrame({
+            '未完了チケット数': counts[counts.columns.intersection(open_status_ids)].sum(axis=1),
+            '残予定工数': hours[hours.columns.intersection(open_status_ids)].sum(axis=1),
+        })
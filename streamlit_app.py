@@ -1,12 +1,20 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import io
+import os
+import time
 
 from redmine_client import RedmineClient
 from ppt_generator import PowerPointGenerator
+from issue_store import IssueStore
+from issue_export import IssueExporter
+from issue_cube import IssueCube
+from chart_cache import FigureCache
+from status_history import DailyStatusCounts, StatusHistory
 
 st.set_page_config(
     page_title="Redmineチケット可視化ダッシュボード",
@@ -75,7 +83,7 @@ def show_welcome_screen():
                     st.success("✅ 接続成功！ダッシュボードに移動します...")
                     st.rerun()
                     return True
-                    
+                
                 except Exception as e:
                     st.error(f"❌ 接続エラー: {str(e)}")
                     st.info("以下を確認してください：\n- RedmineサーバーURLが正しいか\n- APIキーが有効か\n- RedmineのAPI機能が有効になっているか")
@@ -105,29 +113,181 @@ def show_welcome_screen():
             - 期限間近チケットの事前通知
             
             **📄 エクスポート機能**
-            - チケット一覧のCSVダウンロード
+            - チケット一覧のCSV / Excel / Parquetダウンロード
             - 個別チケットのPowerPoint帳票出力
             """)
     
     return False
 
-@st.cache_data
-def load_redmine_data(_redmine_url, _api_key):
-    """Redmineデータを取得（キャッシュ付き）"""
+# バックグラウンドでの定期更新間隔（秒）。0以下で無効
+REFRESH_INTERVAL = float(os.environ.get('REDMINE_REFRESH_INTERVAL', '300'))
+
+@st.cache_resource(on_release=RedmineClient.close)
+def get_redmine_client(redmine_url, api_key):
+    """Redmineクライアントを取得（コネクションプールと永続ストアをセッション間で再利用）
+    
+    キャッシュから外れたクライアントはcloseで定期更新のスレッドを止める。
+    """
+    client = RedmineClient(
+        redmine_url,
+        api_key,
+        pool_size=10,
+        connect_timeout=5.0,
+        read_timeout=30.0,
+        max_retries=3,
+        backoff_factor=0.5,
+        store=IssueStore(redmine_url, api_key),
+        compact_schema=True
+    )
+    if REFRESH_INTERVAL > 0:
+        # 利用者のセッションとは独立して差分同期し、完了したらスナップショットを差し替える
+        client.start_auto_refresh(REFRESH_INTERVAL, max_workers=4)
+    return client
+
+def format_snapshot_age(client):
+    """ヘッダーに表示するスナップショットの鮮度"""
+    age = client.snapshot_age()
+    if age is None:
+        text = "データ取得時刻: 不明"
+    elif age < 60:
+        text = "データ取得: 1分以内"
+    elif age < 3600:
+        text = f"データ取得: {int(age // 60)}分前"
+    else:
+        text = f"データ取得: {int(age // 3600)}時間前"
+    if client.is_syncing():
+        text += "（バックグラウンドで更新中…）"
+    elif client.last_sync_error:
+        text += f"（前回の更新に失敗: {client.last_sync_error}）"
+    return text
+
+@st.cache_resource
+def get_issue_exporter(redmine_url, api_key):
+    """エクスポーターを取得（生成済みファイルをフィルター条件ごとに再利用）"""
+    store = get_redmine_client(redmine_url, api_key).store
+    return IssueExporter(os.path.join(store.directory, f"exports_{store.scope_key}"))
+
+@st.cache_resource
+def get_figure_cache(redmine_url, api_key):
+    """グラフのキャッシュを取得（同じデータ・条件のグラフはセッション間でも再利用）"""
+    return FigureCache(max_size=64)
+
+def render_chart(figure_cache, chart_key, chart_name, builder, *args):
+    """キャッシュ済みのグラフを表示（なければ生成）し、生成結果を返す"""
+    fig = figure_cache.get_or_build(chart_key, chart_name, lambda: builder(*args))
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+@st.cache_resource(max_entries=2)
+def load_status_history(redmine_url, api_key, history_version):
+    """取り込み済みのステータス変更履歴（取り込みのたびにバージョンが変わり読み直す）"""
+    client = get_redmine_client(redmine_url, api_key)
+    return StatusHistory(client.store.load_status_events())
+
+@st.cache_resource(max_entries=2)
+def load_daily_status_counts(redmine_url, api_key, counts_version):
+    """同期ごとに記録した日次スナップショット（記録のたびにバージョンが変わり読み直す）"""
+    client = get_redmine_client(redmine_url, api_key)
+    return DailyStatusCounts(client.store.load_daily_status_counts())
+
+@st.cache_resource(max_entries=2)
+def load_time_rollups(redmine_url, api_key, time_entries_version):
+    """作業時間の集計テーブル（取り込みのたびにバージョンが変わり読み直す）"""
+    client = get_redmine_client(redmine_url, api_key)
+    return client.store.load_time_rollups()
+
+def with_descriptions(client, chunk):
+    """コンパクトスキーマでは説明文を保持していないため、エクスポート時のみ結合する"""
+    if '説明' in chunk.columns:
+        return chunk
+    descriptions = client.get_descriptions(chunk['ID'].tolist())
+    chunk = chunk.copy()
+    chunk.insert(chunk.columns.get_loc('件名') + 1, '説明', chunk['ID'].map(descriptions))
+    return chunk
+
+def load_redmine_data(redmine_url, api_key):
+    """全セッションで共有するRedmineデータを取得（同時の初回読み込みは1回の取得にまとめる）
+    
+    APIキーごとにクライアントとローカルストアが分かれるため、閲覧権限の異なるデータは共有しない。
+    """
     try:
-        client = RedmineClient(_redmine_url, _api_key)
-        issues = client.get_all_issues()
-        df = client.issues_to_dataframe(issues)
-        return df, client
+        client = get_redmine_client(redmine_url, api_key)
+        return client.load_shared_issues(max_workers=4)
     except Exception as e:
         st.error(f"Redmineからのデータ取得に失敗しました: {e}")
-        return pd.DataFrame(), None
+        return 0, pd.DataFrame()
 
-def create_status_chart(df):
-    if df.empty:
+def load_filter_options(redmine_url, api_key):
+    """サーバー側フィルター用のプロジェクト・ステータス一覧を取得（マスタデータのキャッシュを利用）"""
+    reference = get_redmine_client(redmine_url, api_key).get_reference_data()
+    return reference['projects'], reference['issue_statuses']
+
+@st.cache_resource(ttl=600)
+def load_filtered_redmine_data(redmine_url, api_key, filters):
+    """フィルター条件をRedmineに渡して該当チケットのみ取得（条件の組み合わせごとにキャッシュ）
+    
+    同じ条件の同時呼び出しは1回の取得にまとめ、結果は全セッションで読み取り専用として共有する。
+    """
+    try:
+        client = get_redmine_client(redmine_url, api_key)
+        issues = client.get_all_issues(parallel=True, max_workers=4, **dict(filters))
+        return client.issues_to_dataframe(issues)
+    except Exception as e:
+        st.error(f"Redmineからのデータ取得に失敗しました: {e}")
+        return pd.DataFrame()
+
+@st.cache_resource(ttl=600)
+def load_filtered_issue_cube(redmine_url, api_key, filters):
+    """サーバー側で絞り込んだチケットの集計キューブ（取得結果と同じ条件でキャッシュ）"""
+    return IssueCube.from_dataframe(load_filtered_redmine_data(redmine_url, api_key, filters))
+
+@st.cache_resource(max_entries=4)
+def get_issue_cube(redmine_url, api_key, version, _df):
+    """共有データの集計キューブ（データのバージョンごとに一度だけ集計し、全セッションで共有）"""
+    return IssueCube.from_dataframe(_df)
+
+def select_pushdown_filters(redmine_url, api_key):
+    """サーバー側フィルターの選択UIを表示し、Redmineの検索条件を返す"""
+    try:
+        projects, statuses = load_filter_options(redmine_url, api_key)
+    except Exception as e:
+        st.sidebar.error(f"フィルター候補の取得に失敗しました: {e}")
+        projects, statuses = [], []
+    
+    project_names = {project['id']: project['name'] for project in projects}
+    status_names = {status['id']: status['name'] for status in statuses}
+    
+    project_id = st.sidebar.selectbox(
+        "プロジェクト",
+        [None] + list(project_names),
+        format_func=lambda x: 'すべて' if x is None else project_names[x]
+    )
+    status_id = st.sidebar.selectbox(
+        "ステータス",
+        [None] + list(status_names),
+        format_func=lambda x: 'すべて' if x is None else status_names[x]
+    )
+    updated_range = st.sidebar.date_input("更新日（期間）", value=(), help="未指定の場合は期間で絞り込みません")
+    
+    updated_from = updated_range[0] if len(updated_range) > 0 else None
+    updated_to = updated_range[1] if len(updated_range) > 1 else None
+    filters = RedmineClient.build_issue_filters(
+        project_id=project_id,
+        status_id=status_id,
+        updated_from=updated_from,
+        updated_to=updated_to
+    )
+    
+    selected_project = 'すべて' if project_id is None else project_names[project_id]
+    selected_status = 'すべて' if status_id is None else status_names[status_id]
+    return filters, selected_project, selected_status
+
+def create_status_chart(cube):
+    if cube.empty:
         return None
     
-    status_counts = df['ステータス'].value_counts()
+    status_counts = cube.counts('ステータス')
     fig = px.pie(
         values=status_counts.values,
         names=status_counts.index,
@@ -135,11 +295,11 @@ def create_status_chart(df):
     )
     return fig
 
-def create_priority_chart(df):
-    if df.empty:
+def create_priority_chart(cube):
+    if cube.empty:
         return None
     
-    priority_counts = df['優先度'].value_counts()
+    priority_counts = cube.counts('優先度')
     fig = px.bar(
         x=priority_counts.index,
         y=priority_counts.values,
@@ -148,11 +308,11 @@ def create_priority_chart(df):
     fig.update_layout(xaxis_title="優先度", yaxis_title="チケット数")
     return fig
 
-def create_assignee_chart(df):
-    if df.empty:
+def create_assignee_chart(cube):
+    if cube.empty:
         return None
     
-    assignee_counts = df[df['担当者'] != '']['担当者'].value_counts().head(10)
+    assignee_counts = cube.counts('担当者').drop('', errors='ignore').head(10)
     fig = px.bar(
         x=assignee_counts.values,
         y=assignee_counts.index,
@@ -162,11 +322,11 @@ def create_assignee_chart(df):
     fig.update_layout(xaxis_title="チケット数", yaxis_title="担当者")
     return fig
 
-def create_project_chart(df):
-    if df.empty:
+def create_project_chart(cube):
+    if cube.empty:
         return None
     
-    project_counts = df['プロジェクト'].value_counts()
+    project_counts = cube.counts('プロジェクト')
     fig = px.pie(
         values=project_counts.values,
         names=project_counts.index,
@@ -174,11 +334,11 @@ def create_project_chart(df):
     )
     return fig
 
-def create_tracker_chart(df):
-    if df.empty:
+def create_tracker_chart(cube):
+    if cube.empty:
         return None
     
-    tracker_counts = df['トラッカー'].value_counts()
+    tracker_counts = cube.counts('トラッカー')
     fig = px.bar(
         x=tracker_counts.index,
         y=tracker_counts.values,
@@ -214,27 +374,122 @@ def create_deadline_chart(df):
     )
     return fig
 
-def create_schedule_gantt_chart(df):
+# ガントチャートの表示単位（自動の場合、表示期間内のチケットがこの件数を超えるとレーンに集約）
+GANTT_LANES = {'自動': None, 'チケット': None, 'バージョン': 'バージョン', '担当者': '担当者'}
+GANTT_LANE_THRESHOLD = 300
+
+def schedule_window_rows(df, window_start, window_end):
+    """開始日と期限日が両方設定され、表示期間と重なるチケット（開始日順）"""
+    df_schedule = df.dropna(subset=['開始日', '期限日'])
+    overlaps = (df_schedule['開始日'] <= pd.Timestamp(window_end)) & (df_schedule['期限日'] >= pd.Timestamp(window_start))
+    return df_schedule[overlaps].sort_values(['開始日', 'ID'], kind='stable')
+
+def resolve_gantt_lane(df_schedule, lane):
+    """表示単位「自動」を件数に応じてチケット・バージョン・担当者のいずれかに決める"""
+    if lane != '自動':
+        return lane
+    if len(df_schedule) <= GANTT_LANE_THRESHOLD:
+        return 'チケット'
+    # バージョン未設定のチケットが多い場合は担当者でまとめる
+    return 'バージョン' if (df_schedule['バージョン'].astype(str) != '').mean() >= 0.5 else '担当者'
+
+def gantt_segments(starts, ends, labels):
+    """バーを「開始→期限」の線分にし、Noneで区切って1トレースにまとめる"""
+    count = len(labels)
+    x = np.empty(count * 3, dtype=object)
+    y = np.empty(count * 3, dtype=object)
+    x[0::3] = list(starts)
+    x[1::3] = list(ends)
+    x[2::3] = None
+    y[0::3] = list(labels)
+    y[1::3] = list(labels)
+    y[2::3] = None
+    return x, y
+
+def create_schedule_gantt_chart(df, window_start, window_end, row_offset=0, row_limit=50, lane='自動'):
+    """表示期間と重なるチケットのガントチャート（WebGLで描画し、行範囲ぶんだけ送る）
+    
+    件数が多い場合はバージョン・担当者ごとのレーン（最早開始日〜最遅期限日）に集約する。
+    """
     if df.empty:
         return None
     
-    # 開始日と期限日が両方設定されているチケットのみ
-    df_schedule = df.dropna(subset=['開始日', '期限日']).head(20)  # 表示を20件に限定
+    df_schedule = schedule_window_rows(df, window_start, window_end)
     if df_schedule.empty:
         return None
     
-    fig = px.timeline(
-        df_schedule, 
-        x_start="開始日", 
-        x_end="期限日", 
-        y="件名",
-        color="ステータス",
-        title="チケットスケジュール（上位20件）"
+    lane = resolve_gantt_lane(df_schedule, lane)
+    if lane == 'チケット':
+        rows = pd.DataFrame({
+            'ラベル': '#' + df_schedule['ID'].astype(str) + ' ' + df_schedule['件名'].astype(str).str.slice(0, 40),
+            '開始日': df_schedule['開始日'],
+            '期限日': df_schedule['期限日'],
+            '色': df_schedule['ステータス'].astype(str),
+            '詳細': '進捗率: ' + df_schedule['進捗率'].astype(str) + '%',
+        })
+        unit = 'チケット'
+    else:
+        # 未設定の名前は空文字で保持している
+        lane_names = df_schedule[GANTT_LANES[lane]].astype(object).fillna('').replace('', '（未設定）')
+        lanes = df_schedule.groupby(lane_names, sort=False).agg(
+            開始日=('開始日', 'min'),
+            期限日=('期限日', 'max'),
+            チケット数=('ID', 'size'),
+            平均進捗率=('進捗率', 'mean'),
+        ).sort_values('開始日', kind='stable')
+        rows = pd.DataFrame({
+            'ラベル': lanes.index.astype(str) + '（' + lanes['チケット数'].astype(str) + '件）',
+            '開始日': lanes['開始日'],
+            '期限日': lanes['期限日'],
+            '色': lane,
+            '詳細': '平均進捗率: ' + lanes['平均進捗率'].round(1).astype(str) + '%',
+        })
+        unit = lane
+    
+    total = len(rows)
+    rows = rows.iloc[row_offset:row_offset + row_limit]
+    if rows.empty:
+        return None
+    
+    fig = go.Figure()
+    for color, group in rows.groupby('色', sort=False):
+        x, y = gantt_segments(group['開始日'], group['期限日'], group['ラベル'])
+        text = np.repeat(group['詳細'].to_numpy(), 3)
+        fig.add_trace(go.Scattergl(
+            x=x, y=y, text=text, name=str(color), mode='lines',
+            line=dict(width=max(4, min(18, 480 // len(rows)))),
+            hovertemplate='%{y}<br>%{x|%Y-%m-%d}<br>%{text}<extra>%{fullData.name}</extra>',
+        ))
+    
+    fig.update_yaxes(categoryorder='array', categoryarray=list(rows['ラベル']), autorange='reversed', type='category')
+    fig.update_xaxes(type='date', range=[pd.Timestamp(window_start), pd.Timestamp(window_end)])
+    fig.update_layout(
+        title=f"チケットスケジュール（{unit}単位 {row_offset + 1}〜{row_offset + len(rows)} / {total}）",
+        height=max(300, 22 * len(rows) + 150),
+        showlegend=lane == 'チケット',
     )
-    fig.update_yaxes(autorange="reversed")
-    fig.update_layout(height=600)
     return fig
 
+# 散布図の描画方法（この件数を超えるとWebGLで描画し、上限を超えると格子状に集約して送信量を抑える）
+SCATTER_WEBGL_THRESHOLD = 1000
+SCATTER_MAX_POINTS = 5000
+SCATTER_X_BINS = 100
+SCATTER_Y_BIN = 5
+
+def bin_progress_vs_deadline(df_with_deadline):
+    """期限まで日数×進捗率の格子ごとにチケット数と実績工数を集計（点の数は格子数が上限）"""
+    days = df_with_deadline['期限まで日数']
+    low = int(days.min())
+    width = max(1, -(-(int(days.max()) - low + 1) // SCATTER_X_BINS))
+    binned = pd.DataFrame({
+        '期限まで日数': low + (days - low) // width * width + (width - 1) / 2,
+        '進捗率': df_with_deadline['進捗率'] // SCATTER_Y_BIN * SCATTER_Y_BIN,
+        '期限超過': df_with_deadline['期限超過'],
+        '実績工数': df_with_deadline['実績工数'].astype('float64'),
+    })
+    grouped = binned.groupby(['期限まで日数', '進捗率', '期限超過'], observed=True)['実績工数']
+    return grouped.agg(チケット数='size', 実績工数='sum').reset_index()
+
 def create_progress_vs_deadline_chart(df):
     if df.empty:
         return None
@@ -249,38 +504,57 @@ def create_progress_vs_deadline_chart(df):
     df_with_deadline['期限超過'] = (df_with_deadline['期限日'] < today) & (df_with_deadline['進捗率'] < 100)
     df_with_deadline['期限まで日数'] = (df_with_deadline['期限日'] - today).dt.days
     
-    fig = px.scatter(
-        df_with_deadline,
-        x="期限まで日数",
-        y="進捗率",
-        color="期限超過",
-        size="実績工数",
-        hover_data=['件名', 'ステータス', '担当者'],
-        title="進捗率 vs 期限まで日数",
-        color_discrete_map={True: 'red', False: 'blue'}
-    )
+    if len(df_with_deadline) > SCATTER_MAX_POINTS:
+        # 密集した領域は格子単位に集約し、点の大きさをチケット数で表す
+        fig = px.scatter(
+            bin_progress_vs_deadline(df_with_deadline),
+            x="期限まで日数",
+            y="進捗率",
+            color="期限超過",
+            size="チケット数",
+            hover_data=['チケット数', '実績工数'],
+            title=f"進捗率 vs 期限まで日数（{len(df_with_deadline)}件を集約表示）",
+            color_discrete_map={True: 'red', False: 'blue'},
+            render_mode='webgl'
+        )
+    else:
+        fig = px.scatter(
+            df_with_deadline,
+            x="期限まで日数",
+            y="進捗率",
+            color="期限超過",
+            size="実績工数",
+            hover_data=['件名', 'ステータス', '担当者'],
+            title="進捗率 vs 期限まで日数",
+            color_discrete_map={True: 'red', False: 'blue'},
+            render_mode='webgl' if len(df_with_deadline) > SCATTER_WEBGL_THRESHOLD else 'svg'
+        )
     fig.update_layout(
         xaxis_title="期限まで日数（負数は超過）",
         yaxis_title="進捗率（%）"
     )
     return fig
 
-def create_workload_chart(df):
-    if df.empty:
+def create_workload_chart(cube, rollups=None, project_ids=None):
+    """担当者別の予定工数・実績工数・チケット数
+    
+    作業時間を取り込み済みなら、実績工数は時間記録の集計（ユーザー×プロジェクト×週）から求める。
+    """
+    if cube.empty:
         return None
     
     # 担当者別の工数集計
-    df_assigned = df[df['担当者'] != '']
-    if df_assigned.empty:
+    workload_data = cube.totals('担当者').drop('', errors='ignore')
+    if rollups is not None:
+        weekly = rollups['user_project_week']
+        spent = weekly[weekly['project_id'].isin(project_ids)].groupby('user_name')['hours'].sum()
+        workload_data = workload_data[['予定工数', 'チケット数']].join(spent.rename('実績工数'), how='outer').fillna(0)
+        workload_data = workload_data.drop('', errors='ignore').astype({'チケット数': 'int64'})
+    if workload_data.empty:
         return None
     
-    workload_data = df_assigned.groupby('担当者').agg({
-        '予定工数': 'sum',
-        '実績工数': 'sum',
-        'ID': 'count'
-    }).rename(columns={'ID': 'チケット数'})
-    
-    workload_data = workload_data.head(10)  # 上位10名
+    # 工数の多い上位10名（全件をソートせず部分ソートで抽出）
+    workload_data = workload_data.nlargest(10, ['実績工数', '予定工数', 'チケット数'])
     
     fig = go.Figure()
     
@@ -311,7 +585,7 @@ def create_workload_chart(df):
     ))
     
     fig.update_layout(
-        title='担当者別工数・チケット数',
+        title='担当者別工数・チケット数' + ('（実績工数は時間記録より）' if rollups is not None else ''),
         xaxis_title='担当者',
         yaxis=dict(
             title='工数（時間）',
@@ -328,58 +602,417 @@ def create_workload_chart(df):
     
     return fig
 
+def create_weekly_time_chart(rollups, project_ids):
+    weekly = rollups['user_project_week']
+    weekly = weekly[weekly['project_id'].isin(project_ids)]
+    if weekly.empty:
+        return None
+    
+    # 作業時間の多い上位10名
+    top_users = weekly.groupby('user_name')['hours'].sum().nlargest(10).index
+    weekly = weekly[weekly['user_name'].isin(top_users)].groupby(['week', 'user_name'], as_index=False)['hours'].sum()
+    fig = px.bar(
+        weekly,
+        x='week',
+        y='hours',
+        color='user_name',
+        title="週別作業時間（上位10名・時間記録より）"
+    )
+    fig.update_layout(xaxis_title="週", yaxis_title="作業時間（時間）", legend_title="ユーザー")
+    return fig
+
+def create_activity_time_chart(rollups):
+    activity = rollups['user_activity']
+    if activity.empty:
+        return None
+    
+    top_users = activity.groupby('user_name')['hours'].sum().nlargest(10).index
+    activity = activity[activity['user_name'].isin(top_users)]
+    fig = px.bar(
+        activity,
+        x='hours',
+        y='user_name',
+        color='activity_name',
+        orientation='h',
+        title="ユーザー別・作業分類別の作業時間（上位10名・全プロジェクト）"
+    )
+    fig.update_layout(xaxis_title="作業時間（時間）", yaxis_title="ユーザー", legend_title="作業分類")
+    return fig
+
+def show_time_entry_analysis(figure_cache, chart_key, filtered_cube, filtered_df):
+    client = get_redmine_client(st.session_state.redmine_url, st.session_state.api_key)
+    if client.store is None:
+        render_chart(figure_cache, chart_key, 'workload', create_workload_chart, filtered_cube)
+        return
+    
+    st.subheader("⏱ 工数・作業時間（時間記録）")
+    if st.button("⏱ 作業時間を取得", help="前回の取得日以降（過去14日分を含む）の作業時間を取得します"):
+        with st.spinner("作業時間を取得中..."):
+            try:
+                count = client.sync_time_entries(max_workers=4)
+                st.success(f"{count}件の作業時間を取り込みました")
+            except Exception as e:
+                st.error(f"作業時間の取得に失敗しました: {e}")
+    
+    time_entries_version = client.store.get_meta('time_entries_version')
+    if time_entries_version is None:
+        # 時間記録がない間は、チケットの実績工数で担当者別の工数を表示する
+        render_chart(figure_cache, chart_key, 'workload', create_workload_chart, filtered_cube)
+        st.info("作業時間が未取得です。「作業時間を取得」を押してください。")
+        return
+    
+    rollups = load_time_rollups(st.session_state.redmine_url, st.session_state.api_key, time_entries_version)
+    project_ids = tuple(sorted(int(project_id) for project_id in filtered_df['プロジェクトID'].dropna().unique()))
+    time_key = (chart_key, time_entries_version)
+    render_chart(
+        figure_cache, (time_key, project_ids), 'workload', create_workload_chart, filtered_cube, rollups, project_ids
+    )
+    render_chart(figure_cache, (time_key, project_ids), 'weekly_time', create_weekly_time_chart, rollups, project_ids)
+    render_chart(figure_cache, time_key, 'activity_time', create_activity_time_chart, rollups)
+
+def show_basic_analysis(figure_cache, chart_key, filtered_cube, filtered_df):
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        render_chart(figure_cache, chart_key, 'status', create_status_chart, filtered_cube)
+    
+    with col2:
+        render_chart(figure_cache, chart_key, 'priority', create_priority_chart, filtered_cube)
+    
+    render_chart(figure_cache, chart_key, 'tracker', create_tracker_chart, filtered_cube)
+
+def show_assignee_project_analysis(figure_cache, chart_key, filtered_cube, filtered_df):
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        render_chart(figure_cache, chart_key, 'assignee', create_assignee_chart, filtered_cube)
+    
+    with col2:
+        render_chart(figure_cache, chart_key, 'project', create_project_chart, filtered_cube)
+    
+    # 工数分析（フル幅）。作業時間を取り込み済みなら実績工数は時間記録の集計を使う
+    show_time_entry_analysis(figure_cache, chart_key, filtered_cube, filtered_df)
+
+def show_schedule_analysis(figure_cache, chart_key, filtered_cube, filtered_df):
+    st.subheader("📅 スケジュール・期限分析")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        render_chart(figure_cache, chart_key, 'deadline', create_deadline_chart, filtered_df)
+    
+    with col2:
+        render_chart(figure_cache, chart_key, 'progress_vs_deadline', create_progress_vs_deadline_chart, filtered_df)
+    
+    # ガントチャート（フル幅）。表示期間・行範囲の分だけを描画する
+    # 表示期間の初期値はスケジュールが設定されたチケット全体の期間
+    today = pd.Timestamp.now().normalize()
+    first_start = filtered_df['開始日'].min() if not filtered_df.empty else pd.NaT
+    last_due = filtered_df['期限日'].max() if not filtered_df.empty else pd.NaT
+    if pd.isna(first_start) or pd.isna(last_due) or first_start > last_due:
+        first_start, last_due = today - timedelta(days=30), today + timedelta(days=90)
+    
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
+    with col1:
+        gantt_lane = st.selectbox("表示単位", list(GANTT_LANES.keys()), key='gantt_lane')
+    with col2:
+        gantt_window = st.date_input(
+            "表示期間",
+            value=(first_start.date(), last_due.date()),
+            key='gantt_window'
+        )
+    with col3:
+        gantt_rows = st.selectbox("表示行数", [25, 50, 100, 200], index=1, key='gantt_rows')
+    with col4:
+        gantt_start_row = st.number_input("開始行", min_value=1, value=1, step=gantt_rows, key='gantt_start_row')
+    
+    # 期間の選択途中（開始日のみ）の場合は開始日から120日間を表示する
+    if len(gantt_window) == 2:
+        window_start, window_end = gantt_window
+    else:
+        window_start, window_end = gantt_window[0], gantt_window[0] + timedelta(days=120)
+    gantt_params = (gantt_lane, window_start, window_end, int(gantt_start_row) - 1, gantt_rows)
+    
+    gantt_chart = render_chart(
+        figure_cache, chart_key + gantt_params, 'schedule_gantt', create_schedule_gantt_chart, filtered_df,
+        window_start, window_end, int(gantt_start_row) - 1, gantt_rows, gantt_lane
+    )
+    if not gantt_chart:
+        st.info("表示期間・行範囲内に、開始日と期限日が両方設定されたチケットがありません。")
+
+def create_time_in_status_chart(history, status_names):
+    time_in_status = history.time_in_status()
+    if time_in_status.empty:
+        return None
+    
+    time_in_status = StatusHistory.name_statuses(time_in_status, status_names)
+    fig = px.bar(
+        x=time_in_status.index,
+        y=time_in_status['平均日数'],
+        hover_data={'チケット数': time_in_status['チケット数'], '中央値日数': time_in_status['中央値日数']},
+        title="ステータス別平均滞在日数"
+    )
+    fig.update_layout(xaxis_title="ステータス", yaxis_title="平均滞在日数")
+    return fig
+
+def create_status_flow_chart(history, status_names):
+    flow = history.cumulative_flow()
+    if flow.empty:
+        return None
+    
+    flow = StatusHistory.name_statuses(flow, status_names, axis=1)
+    fig = px.area(flow, title="ステータス別チケット数の推移（変更履歴から算出）")
+    fig.update_layout(xaxis_title="日付", yaxis_title="チケット数", legend_title="ステータス")
+    return fig
+
+def show_status_history_analysis(figure_cache, chart_key, filtered_cube, filtered_df):
+    st.subheader("🕘 ステータス履歴分析")
+    
+    client = get_redmine_client(st.session_state.redmine_url, st.session_state.api_key)
+    if client.store is None:
+        st.info("ステータス履歴の分析にはローカルストアが必要です。")
+        return
+    
+    if st.button("🕘 ステータス履歴を取得", help="表示中のチケットの変更履歴を取得します（前回の取得以降に更新されたチケットのみ）"):
+        progress_bar = st.progress(0.0)
+        try:
+            count = client.sync_status_history(
+                filtered_df,
+                max_workers=8,
+                progress_callback=lambda done, total: progress_bar.progress(done / total)
+            )
+            st.success(f"{count}件のチケットの変更履歴を取り込みました")
+        except Exception as e:
+            st.error(f"変更履歴の取得に失敗しました: {e}")
+    
+    history_version = client.store.get_meta('status_history_version')
+    history = load_status_history(st.session_state.redmine_url, st.session_state.api_key, history_version)
+    history = history.for_issues(filtered_df['ID'])
+    if history.empty:
+        st.info("変更履歴が未取得です。「ステータス履歴を取得」を押してください。")
+        return
+    
+    try:
+        statuses = client.get_reference_data()['issue_statuses']
+    except Exception as e:
+        st.warning(f"ステータス一覧の取得に失敗しました: {e}")
+        statuses = []
+    status_names = {status['id']: status['name'] for status in statuses}
+    closed_status_ids = [status['id'] for status in statuses if status.get('is_closed')]
+    
+    times = history.lead_and_cycle_times(closed_status_ids)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("完了チケット数", len(times))
+    with col2:
+        st.metric("平均リードタイム", f"{times['リードタイム'].mean():.1f}日" if not times.empty else "-")
+    with col3:
+        st.metric("平均サイクルタイム", f"{times['サイクルタイム'].mean():.1f}日" if not times.empty else "-")
+    
+    history_key = (chart_key, history_version)
+    col1, col2 = st.columns(2)
+    with col1:
+        render_chart(figure_cache, history_key, 'time_in_status', create_time_in_status_chart, history, status_names)
+    with col2:
+        render_chart(figure_cache, history_key, 'status_flow', create_status_flow_chart, history, status_names)
+
+def create_cumulative_flow_chart(daily_counts, project_ids, status_names):
+    flow = daily_counts.by_status(project_ids)
+    if flow.empty:
+        return None
+    
+    flow = StatusHistory.name_statuses(flow, status_names, axis=1)
+    fig = px.area(flow, title="累積フロー図（ステータス別チケット数）")
+    fig.update_layout(xaxis_title="日付", yaxis_title="チケット数", legend_title="ステータス")
+    return fig
+
+def create_burndown_chart(daily_counts, project_ids, open_status_ids):
+    burndown = daily_counts.burndown(open_status_ids, project_ids)
+    if burndown.empty:
+        return None
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        name='未完了チケット数',
+        x=burndown.index,
+        y=burndown['未完了チケット数'],
+        mode='lines',
+        line=dict(width=3)
+    ))
+    fig.add_trace(go.Scatter(
+        name='残予定工数',
+        x=burndown.index,
+        y=burndown['残予定工数'],
+        yaxis='y2',
+        mode='lines',
+        line=dict(color='orange', dash='dot')
+    ))
+    fig.update_layout(
+        title='バーンダウン',
+        xaxis_title='日付',
+        yaxis=dict(title='チケット数', side='left'),
+        yaxis2=dict(title='予定工数（時間）', side='right', overlaying='y')
+    )
+    return fig
+
+def show_trend_analysis(figure_cache, chart_key, filtered_cube, filtered_df):
+    st.subheader("📈 推移分析")
+    st.caption("同期のたびに記録したプロジェクト×ステータス別の日次件数から作成します（ステータスの絞り込みは適用しません）。")
+    
+    client = get_redmine_client(st.session_state.redmine_url, st.session_state.api_key)
+    if client.store is None:
+        st.info("推移の表示にはローカルストアが必要です。")
+        return
+    
+    counts_version = client.store.get_meta('status_counts_version')
+    daily_counts = load_daily_status_counts(st.session_state.redmine_url, st.session_state.api_key, counts_version)
+    if daily_counts.empty:
+        st.info("まだ日次の記録がありません。同期が行われると記録されます。")
+        return
+    
+    try:
+        statuses = client.get_reference_data()['issue_statuses']
+    except Exception as e:
+        st.warning(f"ステータス一覧の取得に失敗しました: {e}")
+        statuses = []
+    status_names = {status['id']: status['name'] for status in statuses}
+    open_status_ids = [status['id'] for status in statuses if not status.get('is_closed')]
+    project_ids = tuple(sorted(int(project_id) for project_id in filtered_df['プロジェクトID'].dropna().unique()))
+    
+    trend_key = (chart_key, counts_version, project_ids)
+    render_chart(figure_cache, trend_key, 'cumulative_flow', create_cumulative_flow_chart, daily_counts, project_ids, status_names)
+    render_chart(figure_cache, trend_key, 'burndown', create_burndown_chart, daily_counts, project_ids, open_status_ids)
+
 def show_dashboard():
     """ダッシュボード画面を表示"""
     # ヘッダー部分
     col1, col2 = st.columns([4, 1])
     with col1:
         st.title("📊 Redmineチケット可視化ダッシュボード")
+        snapshot_status = st.empty()
     with col2:
+        refresh_clicked = st.button("🔄 差分更新", help="前回取得以降に更新されたチケットのみ再取得")
         if st.button("🔧 設定変更", help="接続設定を変更"):
+            # この接続先のクライアントとグラフ・エクスポートのキャッシュだけを破棄し、定期更新を止める
+            # （他の接続先のセッションには影響させない。集計キューブはクライアントごとに異なるバージョンで引き直される）
+            redmine_url, api_key = st.session_state.redmine_url, st.session_state.api_key
+            get_redmine_client.clear(redmine_url, api_key)
+            get_issue_exporter.clear(redmine_url, api_key)
+            get_figure_cache.clear(redmine_url, api_key)
             # セッション状態をクリアして設定画面に戻る
             for key in ['redmine_url', 'api_key', 'connected']:
                 if key in st.session_state:
                     del st.session_state[key]
-            # キャッシュもクリア
-            st.cache_data.clear()
             st.rerun()
     
     st.markdown("---")
     
-    # Redmineデータを取得
-    df, client = load_redmine_data(st.session_state.redmine_url, st.session_state.api_key)
-    
-    if df.empty:
-        st.warning("データが取得できませんでした。設定を確認してください。")
-        return
+    client = get_redmine_client(st.session_state.redmine_url, st.session_state.api_key)
     
     st.sidebar.header("フィルター設定")
+    pushdown = st.sidebar.checkbox(
+        "サーバー側で絞り込む",
+        help="選択した条件をRedmineの検索条件として送信し、該当するチケットのみを取得します"
+    )
+    
+    if pushdown:
+        # 条件に一致するチケットだけをRedmineから取得（条件の組み合わせごとにキャッシュ）
+        filters, selected_project, selected_status = select_pushdown_filters(
+            st.session_state.redmine_url, st.session_state.api_key
+        )
+        if refresh_clicked:
+            load_filtered_redmine_data.clear()
+            load_filtered_issue_cube.clear()
+        filters_key = tuple(sorted(filters.items()))
+        df = load_filtered_redmine_data(st.session_state.redmine_url, st.session_state.api_key, filters_key)
+        filtered_df = df
+        filtered_cube = load_filtered_issue_cube(st.session_state.redmine_url, st.session_state.api_key, filters_key)
+        # 差分更新で取得結果が変わった場合も別のデータとして扱う
+        data_version = ('pushdown', filters_key, len(df), str(df['更新日'].max()) if not df.empty else None)
+    else:
+        # Redmineデータを取得（初回は全件、以降は差分同期）
+        # 全セッション共通のデータ（バックグラウンド同期の結果は次の再実行で反映される）
+        issues_version, df = load_redmine_data(st.session_state.redmine_url, st.session_state.api_key)
+        
+        if refresh_clicked and not df.empty:
+            with st.spinner("更新されたチケットを取得中..."):
+                try:
+                    client.sync_issues(max_workers=4)
+                    issues_version, df = client.get_latest_issues()
+                except Exception as e:
+                    st.error(f"差分更新に失敗しました: {e}")
+        
+        snapshot_status.caption(format_snapshot_age(client))
+        
+        if df.empty:
+            st.warning("データが取得できませんでした。設定を確認してください。")
+            return
+        
+        projects = ['すべて'] + list(df['プロジェクト'].unique())
+        selected_project = st.sidebar.selectbox("プロジェクト", projects)
+        
+        statuses = ['すべて'] + list(df['ステータス'].unique())
+        selected_status = st.sidebar.selectbox("ステータス", statuses)
+        
+        # 共有データは読み取り専用として扱い、絞り込み結果のみを新しく作る
+        filtered_df = df
+        if selected_project != 'すべて':
+            filtered_df = filtered_df[filtered_df['プロジェクト'] == selected_project]
+        if selected_status != 'すべて':
+            filtered_df = filtered_df[filtered_df['ステータス'] == selected_status]
+        
+        # グラフと概要統計は集計キューブの切り出しで求める（フィルター変更時に全件を走査しない）
+        cube_filters = {}
+        if selected_project != 'すべて':
+            cube_filters['プロジェクト'] = selected_project
+        if selected_status != 'すべて':
+            cube_filters['ステータス'] = selected_status
+        issues_cube = get_issue_cube(st.session_state.redmine_url, st.session_state.api_key, issues_version, df)
+        filtered_cube = issues_cube.slice(cube_filters)
+        data_version = ('local', issues_version)
+    
+    st.sidebar.checkbox(
+        "次ページのチケット詳細も先読み",
+        value=True,
+        key='prefetch_next_page',
+        help="チケット一覧の表示中に、次のページのチケット詳細もバックグラウンドで取得します"
+    )
     
-    projects = ['すべて'] + list(df['プロジェクト'].unique())
-    selected_project = st.sidebar.selectbox("プロジェクト", projects)
+    st.sidebar.checkbox(
+        "選択中の分析ビューのみ描画",
+        value=True,
+        key='lazy_analysis_views',
+        help="オフにすると、すべての分析グラフをタブ形式でまとめて描画します"
+    )
     
-    statuses = ['すべて'] + list(df['ステータス'].unique())
-    selected_status = st.sidebar.selectbox("ステータス", statuses)
+    performance_expander = st.sidebar.expander("⚙️ パフォーマンス情報")
+    with performance_expander:
+        st.caption(f"メモリ使用量: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f}MB")
+        st.caption(f"1チケットあたり: {client.memory_per_issue(df):.0f} bytes")
+        cache_stats = client.detail_cache.stats()
+        st.caption(
+            f"詳細キャッシュ: {cache_stats['size']}件 / ヒット {cache_stats['hits']} / "
+            f"ミス {cache_stats['misses']} (ヒット率 {cache_stats['hit_rate']:.0%})"
+        )
     
-    filtered_df = df.copy()
-    if selected_project != 'すべて':
-        filtered_df = filtered_df[filtered_df['プロジェクト'] == selected_project]
-    if selected_status != 'すべて':
-        filtered_df = filtered_df[filtered_df['ステータス'] == selected_status]
+    if pushdown and df.empty:
+        st.warning("条件に一致するチケットがありません。フィルター条件を確認してください。")
+        return
     
     st.header("📈 概要統計")
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("総チケット数", len(filtered_df))
+        st.metric("総チケット数", filtered_cube.total_count())
     with col2:
-        open_tickets = len(filtered_df[~filtered_df['ステータス'].str.contains('終了|完了|解決済み', na=False)])
+        # Redmineのステータス設定（is_closed）で完了を判定する
+        open_tickets = filtered_cube.open_count(client.closed_status_names())
         st.metric("未完了チケット数", open_tickets)
     with col3:
-        avg_progress = filtered_df['進捗率'].mean()
+        avg_progress = filtered_cube.average_progress()
         st.metric("平均進捗率", f"{avg_progress:.1f}%")
     with col4:
-        total_hours = filtered_df['実績工数'].sum()
+        total_hours = filtered_cube.total_spent_hours()
         st.metric("総実績工数", f"{total_hours:.1f}h")
     
     # アラート表示
@@ -417,70 +1050,52 @@ def show_dashboard():
     st.markdown("---")
     st.header("📊 チケット分析グラフ")
     
-    tab1, tab2, tab3 = st.tabs(["基本分析", "担当者・プロジェクト分析", "スケジュール・期限分析"])
+    # グラフはデータのバージョンとフィルター条件が変わらない限り再利用する（期限関連のグラフは日付も考慮）
+    figure_cache = get_figure_cache(st.session_state.redmine_url, st.session_state.api_key)
+    chart_key = (data_version, selected_project, selected_status, today)
     
-    with tab1:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            status_chart = create_status_chart(filtered_df)
-            if status_chart:
-                st.plotly_chart(status_chart, use_container_width=True)
-        
-        with col2:
-            priority_chart = create_priority_chart(filtered_df)
-            if priority_chart:
-                st.plotly_chart(priority_chart, use_container_width=True)
-        
-        tracker_chart = create_tracker_chart(filtered_df)
-        if tracker_chart:
-            st.plotly_chart(tracker_chart, use_container_width=True)
-    
-    with tab2:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            assignee_chart = create_assignee_chart(filtered_df)
-            if assignee_chart:
-                st.plotly_chart(assignee_chart, use_container_width=True)
-        
-        with col2:
-            project_chart = create_project_chart(filtered_df)
-            if project_chart:
-                st.plotly_chart(project_chart, use_container_width=True)
-        
-        # 工数分析（フル幅）
-        workload_chart = create_workload_chart(filtered_df)
-        if workload_chart:
-            st.plotly_chart(workload_chart, use_container_width=True)
+    analysis_views = {
+        "基本分析": show_basic_analysis,
+        "担当者・プロジェクト分析": show_assignee_project_analysis,
+        "スケジュール・期限分析": show_schedule_analysis,
+        "ステータス履歴分析": show_status_history_analysis,
+        "推移分析": show_trend_analysis,
+    }
+    if st.session_state.get('lazy_analysis_views', True):
+        # 選択中のビューのグラフのみ生成する（st.tabsは全タブの中身を毎回実行するため）
+        selected_view = st.radio(
+            "表示する分析",
+            list(analysis_views),
+            horizontal=True,
+            key='analysis_view',
+            label_visibility="collapsed"
+        )
+        analysis_views[selected_view](figure_cache, chart_key, filtered_cube, filtered_df)
+    else:
+        for tab, show_view in zip(st.tabs(list(analysis_views)), analysis_views.values()):
+            with tab:
+                show_view(figure_cache, chart_key, filtered_cube, filtered_df)
     
-    with tab3:
-        st.subheader("📅 スケジュール・期限分析")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            deadline_chart = create_deadline_chart(filtered_df)
-            if deadline_chart:
-                st.plotly_chart(deadline_chart, use_container_width=True)
-        
-        with col2:
-            progress_chart = create_progress_vs_deadline_chart(filtered_df)
-            if progress_chart:
-                st.plotly_chart(progress_chart, use_container_width=True)
-        
-        # ガントチャート（フル幅）
-        gantt_chart = create_schedule_gantt_chart(filtered_df)
-        if gantt_chart:
-            st.plotly_chart(gantt_chart, use_container_width=True)
-        else:
-            st.info("スケジュール表示には開始日と期限日が両方設定されたチケットが必要です。")
+    with performance_expander:
+        chart_stats = figure_cache.stats()
+        if chart_stats:
+            st.caption("グラフキャッシュ")
+            st.dataframe(
+                pd.DataFrame(chart_stats),
+                hide_index=True,
+                column_config={
+                    'ヒット率(%)': st.column_config.NumberColumn(format="%.0f"),
+                    '平均生成時間(ms)': st.column_config.NumberColumn(format="%.1f"),
+                    '直近生成時間(ms)': st.column_config.NumberColumn(format="%.1f"),
+                    'データ量(KB)': st.column_config.NumberColumn(format="%.1f"),
+                }
+            )
     
     st.markdown("---")
     st.header("📄 チケット一覧・詳細・エクスポート")
     
     # タブで機能を分割
-    tab1, tab2 = st.tabs(["📋 チケット一覧", "📥 CSVエクスポート"])
+    tab1, tab2, tab3 = st.tabs(["📋 チケット一覧", "📥 エクスポート", "📑 一括帳票出力"])
     
     with tab1:
         st.subheader("チケット一覧")
@@ -517,6 +1132,16 @@ def show_dashboard():
             end_idx = min(start_idx + items_per_page, total_items)
             page_df = display_df.iloc[start_idx:end_idx].copy()
             
+            # 表示中のページ（と必要なら次のページ）のチケット詳細をバックグラウンドで先読み
+            prefetch_end = end_idx
+            if st.session_state.get('prefetch_next_page', True):
+                prefetch_end = min(end_idx + items_per_page, total_items)
+            prefetch_rows = filtered_df.iloc[start_idx:prefetch_end]
+            client.prefetch_issues(
+                prefetch_rows['ID'].tolist(),
+                updated_on=dict(zip(prefetch_rows['ID'], prefetch_rows['更新日']))
+            )
+            
             # チケット選択用のラジオボタン
             if 'selected_ticket_id' not in st.session_state:
                 st.session_state.selected_ticket_id = None
@@ -605,8 +1230,10 @@ def show_dashboard():
                 
                 with col1:
                     try:
-                        # チケット詳細データを取得
-                        ticket_detail = client.get_issue_by_id(selected_ticket_id)
+                        # チケット詳細データを取得（一覧の更新日と一致するキャッシュがあれば再利用）
+                        selected_rows = filtered_df[filtered_df['ID'] == selected_ticket_id]
+                        updated_on = selected_rows['更新日'].iloc[0] if not selected_rows.empty else None
+                        ticket_detail = client.get_issue_by_id(selected_ticket_id, updated_on=updated_on)
                         
                         # 基本情報を表示
                         info_col1, info_col2 = st.columns(2)
@@ -658,7 +1285,7 @@ def show_dashboard():
                                     st.markdown(f"**{user_name}** - {created_on}")
                                     st.write(notes)
                                     st.markdown("---")
-                        
+                    
                     except Exception as e:
                         st.error(f"チケット詳細の取得に失敗しました: {e}")
                     
@@ -682,7 +1309,7 @@ def show_dashboard():
                                     )
                                     
                                     st.success(f"✅ チケット#{selected_ticket_id}の帳票が生成されました！")
-                                    
+                            
                             except Exception as e:
                                 st.error(f"PowerPoint生成エラー: {e}")
             else:
@@ -691,7 +1318,7 @@ def show_dashboard():
             st.info("チケットデータがありません。")
     
     with tab2:
-        st.subheader("CSVエクスポート")
+        st.subheader("エクスポート")
         
         col1, col2 = st.columns([2, 1])
         
@@ -704,16 +1331,154 @@ def show_dashboard():
         
         with col2:
             if not filtered_df.empty:
-                csv = filtered_df.to_csv(index=False, encoding='utf-8-sig')
-                st.download_button(
-                    label="📥 CSVファイルをダウンロード",
-                    data=csv,
-                    file_name=f"redmine_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv",
-                    use_container_width=True
+                exporter = get_issue_exporter(st.session_state.redmine_url, st.session_state.api_key)
+                export_format = st.radio(
+                    "ファイル形式",
+                    list(IssueExporter.FORMATS),
+                    format_func=lambda x: IssueExporter.FORMATS[x][0],
+                    horizontal=True
                 )
+                _, export_mime, export_extension = IssueExporter.FORMATS[export_format]
+                
+                export_key = (data_version, selected_project, selected_status)
+                if pushdown:
+                    def export_chunks():
+                        for chunk in exporter.iter_dataframe_chunks(filtered_df):
+                            yield with_descriptions(client, chunk)
+                else:
+                    snapshot_filters = {}
+                    if selected_project != 'すべて':
+                        snapshot_filters['プロジェクト'] = selected_project
+                    if selected_status != 'すべて':
+                        snapshot_filters['ステータス'] = selected_status
+                    
+                    def export_chunks():
+                        # スナップショットから絞り込みながら読み出し、全件をメモリに展開しない
+                        chunks = client.store.iter_snapshot_chunks(exporter.chunk_size, snapshot_filters)
+                        for chunk in chunks:
+                            yield with_descriptions(client, chunk)
+                
+                # ファイルはボタン押下時にのみ作成し、再描画のたびに変換しない
+                if st.button("📦 エクスポートファイルを作成", use_container_width=True):
+                    with st.spinner("エクスポートファイルを作成中..."):
+                        try:
+                            st.session_state.export_ready = (
+                                export_key, export_format, exporter.export(export_key, export_format, export_chunks)
+                            )
+                        except Exception as e:
+                            st.error(f"エクスポートに失敗しました: {e}")
+                
+                export_ready = st.session_state.get('export_ready')
+                if export_ready and export_ready[:2] == (export_key, export_format) and os.path.exists(export_ready[2]):
+                    with open(export_ready[2], 'rb') as f:
+                        st.download_button(
+                            label=f"📥 {IssueExporter.FORMATS[export_format][0]}ファイルをダウンロード",
+                            data=f,
+                            file_name=f"redmine_tickets_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_extension}",
+                            mime=export_mime,
+                            on_click=lambda: st.session_state.pop('export_ready', None),
+                            use_container_width=True
+                        )
             else:
                 st.info("エクスポートするデータがありません。")
+    
+    with tab3:
+        st.subheader("PowerPoint一括帳票出力")
+        
+        if filtered_df.empty:
+            st.info("帳票を出力するチケットがありません。")
+        else:
+            col1, col2 = st.columns([2, 1])
+            
+            with col1:
+                st.write(f"現在のフィルター条件でのチケット数: **{len(filtered_df)}件**")
+                max_issues = st.number_input(
+                    "出力するチケット数（一覧の先頭から）",
+                    min_value=1,
+                    max_value=len(filtered_df),
+                    value=min(100, len(filtered_df))
+                )
+                output_format = st.radio(
+                    "出力形式",
+                    ["1つのファイルにまとめる", "チケットごとのファイル（ZIP）"],
+                    horizontal=True
+                )
+                render_workers = st.number_input(
+                    "並列レンダリングのプロセス数",
+                    min_value=1,
+                    max_value=os.cpu_count() or 1,
+                    value=1,
+                    help="2以上を指定するとスライド生成を複数プロセスに分散します（大量出力向け）"
+                )
+                use_template = st.checkbox(
+                    "テンプレート方式で生成",
+                    value=True,
+                    help="組み立て済みのスライドを複製して値を差し込むため、大量出力時に高速です"
+                )
+                template_file = st.file_uploader(
+                    "ブランド用テンプレート（任意）",
+                    type=['pptx'],
+                    help="1枚目のスライドに {{subject}} や {{status}} などのプレースホルダーを配置した.pptxを指定します"
+                )
+            
+            with col2:
+                if st.button("📑 一括帳票生成", type="primary", use_container_width=True):
+                    target_rows = filtered_df.head(int(max_issues))
+                    issue_ids = target_rows['ID'].tolist()
+                    progress = st.progress(0.0, text="チケット詳細を取得中...")
+                    
+                    def update_progress(count, issue_data):
+                        progress.progress(count / len(issue_ids), text=f"帳票を生成中... {count} / {len(issue_ids)}件")
+                    
+                    try:
+                        # 詳細は並列取得し、取得できた順にスライドへ書き出す
+                        issues = client.iter_issues_by_ids(
+                            issue_ids,
+                            updated_on=dict(zip(target_rows['ID'], target_rows['更新日'])),
+                            max_workers=4
+                        )
+                        ppt_gen = PowerPointGenerator(
+                            use_template=use_template,
+                            template=template_file.getvalue() if template_file is not None else None
+                        )
+                        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                        as_zip = output_format != "1つのファイルにまとめる"
+                        if render_workers > 1:
+                            # 詳細を揃えてからプロセスプールで並列レンダリング
+                            report_bytes, render_stats = ppt_gen.render_parallel(
+                                list(issues),
+                                workers=int(render_workers),
+                                as_zip=as_zip,
+                                progress_callback=update_progress
+                            )
+                        else:
+                            render_start = time.perf_counter()
+                            if as_zip:
+                                report_bytes = ppt_gen.create_batch_zip(issues, progress_callback=update_progress)
+                            else:
+                                report_bytes = ppt_gen.create_batch_report(issues, progress_callback=update_progress)
+                            elapsed = time.perf_counter() - render_start
+                            render_stats = {'slides_per_sec': len(issue_ids) / elapsed if elapsed > 0 else 0.0}
+                        
+                        if as_zip:
+                            file_name = f"tickets_reports_{timestamp}.zip"
+                            mime = "application/zip"
+                        else:
+                            file_name = f"tickets_report_{timestamp}.pptx"
+                            mime = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+                        
+                        st.download_button(
+                            label="💾 帳票ファイルをダウンロード",
+                            data=report_bytes,
+                            file_name=file_name,
+                            mime=mime,
+                            use_container_width=True
+                        )
+                        st.success(f"✅ {len(issue_ids)}件の帳票が生成されました！")
+                        st.caption(f"処理速度: {render_stats['slides_per_sec']:.1f} スライド/秒")
+                    
+                    except Exception as e:
+                        st.error(f"PowerPoint生成エラー: {e}")
 
 def main():
     """メイン関数 - 画面遷移を制御"""
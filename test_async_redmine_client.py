@@ -0,0 +1,132 @@
+"""
+AsyncRedmineClientのテスト（ローカルに起動した簡易Redmineサーバーに接続）
+    
+    python -m pytest test_async_redmine_client.py
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from async_redmine_client import AsyncRedmineClient, SyncRedmineClient
+
+ISSUES = [{'id': issue_id, 'subject': f"チケット{issue_id}"} for issue_id in range(250, 0, -1)]
+USERS = [{'id': user_id, 'name': f"ユーザー{user_id}"} for user_id in range(1, 131)]
+
+class FakeRedmineHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    active = 0
+    max_active = 0
+    failures = {}
+    lock = threading.Lock()
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        with self.lock:
+            FakeRedmineHandler.active += 1
+            FakeRedmineHandler.max_active = max(FakeRedmineHandler.max_active, FakeRedmineHandler.active)
+        try:
+            time.sleep(0.02)
+            self.handle_path(url.path, query)
+        finally:
+            with self.lock:
+                FakeRedmineHandler.active -= 1
+    
+    def handle_path(self, path, query):
+        if self.headers.get('X-Redmine-API-Key') != 'test-key':
+            return self.send_json(401, {})
+        # 指定回数だけ503を返してリトライを確認する
+        if self.failures.get(path, 0) > 0:
+            self.failures[path] -= 1
+            return self.send_json(503, {})
+        
+        offset = int(query.get('offset', ['0'])[0])
+        limit = int(query.get('limit', ['25'])[0])
+        if path == '/issues.json':
+            self.send_json(200, {'issues': ISSUES[offset:offset + limit], 'total_count': len(ISSUES)})
+        elif path == '/users.json':
+            self.send_json(200, {'users': USERS[offset:offset + limit], 'total_count': len(USERS)})
+        elif path == '/projects.json':
+            self.send_json(200, {'projects': [{'id': 1, 'name': 'プロジェクト1'}]})
+        elif path.startswith('/issues/'):
+            issue_id = int(path.split('/')[2].split('.')[0])
+            if issue_id > len(ISSUES):
+                return self.send_json(404, {})
+            self.send_json(200, {'issue': {'id': issue_id, 'journals': []}})
+        else:
+            self.send_json(404, {})
+    
+    def send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, *args):
+        pass
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeRedmineHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+def test_get_all_issues_keeps_page_order():
+    server, url = start_server()
+    
+    async def run():
+        async with AsyncRedmineClient(url, 'test-key') as client:
+            return await client.get_all_issues()
+    
+    try:
+        issues = asyncio.run(run())
+        assert [issue['id'] for issue in issues] == [issue['id'] for issue in ISSUES]
+    finally:
+        server.shutdown()
+
+def test_concurrency_is_bounded_by_semaphore():
+    server, url = start_server()
+    FakeRedmineHandler.max_active = 0
+    
+    async def run():
+        async with AsyncRedmineClient(url, 'test-key', max_concurrency=3) as client:
+            return await client.get_issues_by_ids(range(1, 31))
+    
+    try:
+        issues = asyncio.run(run())
+        assert [issue['id'] for issue in issues] == list(range(1, 31))
+        assert FakeRedmineHandler.max_active <= 3
+    finally:
+        server.shutdown()
+
+def test_retry_on_server_error():
+    server, url = start_server()
+    FakeRedmineHandler.failures['/projects.json'] = 2
+    
+    async def run():
+        async with AsyncRedmineClient(url, 'test-key', backoff_factor=0.01) as client:
+            return await client.get_projects()
+    
+    try:
+        assert asyncio.run(run()) == [{'id': 1, 'name': 'プロジェクト1'}]
+    finally:
+        server.shutdown()
+
+def test_sync_facade():
+    server, url = start_server()
+    client = SyncRedmineClient(url, 'test-key')
+    try:
+        assert len(client.get_users()) == len(USERS)
+        assert client.get_issues(limit=10)['total_count'] == len(ISSUES)
+        assert client.get_issue_by_id(5)['id'] == 5
+        with pytest.raises(Exception, match="チケット詳細取得エラー"):
+            client.get_issue_by_id(999)
+    finally:
+        client.close()
+        server.shutdown()